@@ -0,0 +1,59 @@
+#benchmarks/__main__.py:
+
+"""
+Benchmark suite of the generation, export, load and dashboard paths.
+
+    python -m benchmarks run                         # x1, x10, x100, eredmény: benchmarks/results/<commit>.json
+    python -m benchmarks run --scales 1 10 -k save   # csak a "save" nevű benchmarkok
+    python -m benchmarks compare <régi> [<új>]       # commit vagy fájl; az új alapból a legutóbbi eredmény
+"""
+
+import argparse
+import sys
+
+from benchmarks import suite
+from benchmarks.runner import REGRESSION_THRESHOLD, compare, latest_results, load_results, run, save_results
+
+DEFAULT_SCALES = [1, 10, 100]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run the benchmarks and store the results")
+    run_cmd.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                         help="multiples of the 32 player / 231 race default")
+    run_cmd.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark and scale")
+    run_cmd.add_argument("-k", dest="pattern", help="only benchmarks whose name contains this")
+    run_cmd.add_argument("--compare", dest="baseline", help="compare with this commit / result file afterwards")
+
+    cmp_cmd = commands.add_parser("compare", help="compare two stored results")
+    cmp_cmd.add_argument("old")
+    cmp_cmd.add_argument("new", nargs="?")
+    cmp_cmd.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        # az alapot mentés előtt olvassuk: ugyanazon a commiton a mentés felülírná
+        baseline = load_results(args.baseline) if args.baseline else None
+        report = run(suite.Dataset.build, args.scales, repeat=args.repeat, pattern=args.pattern)
+        print(f"Eredmény: {save_results(report)}")
+        if baseline is None:
+            return 0
+        old, new, threshold = baseline, report, REGRESSION_THRESHOLD
+    else:
+        new_ref = args.new or latest_results()
+        if new_ref is None:
+            print("Nincs mentett eredmény.")
+            return 1
+        old, new, threshold = load_results(args.old), load_results(str(new_ref)), args.threshold
+
+    lines = compare(old, new, threshold)
+    print("\n".join(lines))
+    return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
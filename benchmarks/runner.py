@@ -0,0 +1,166 @@
+#benchmarks/runner.py:
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from functions.clear_results import clear_results
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# ennyivel lassabb medián már regressziónak számít
+REGRESSION_THRESHOLD = 0.10
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # setup(dataset) -> a mérendő hívás; minden ismétlés előtt újra fut (nem mérjük)
+    setup: Callable[[Any], Callable[[], Any]]
+
+
+_REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str):
+    """Register `setup(dataset) -> callable` as a benchmark."""
+    def register(setup):
+        _REGISTRY.append(Benchmark(name, setup))
+        return setup
+    return register
+
+
+def registered(pattern: Optional[str] = None) -> List[Benchmark]:
+    return [b for b in _REGISTRY if not pattern or pattern in b.name]
+
+
+def git_commit() -> str:
+    """Short hash of HEAD, with a -dirty suffix if tracked files are modified."""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=root).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def time_benchmark(bench: Benchmark, dataset: Any, repeat: int) -> Dict[str, Any]:
+    times = []
+    for _ in range(repeat):
+        fn = bench.setup(dataset)
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "runs": times
+    }
+
+
+def run(
+    make_dataset: Callable[[int], Any],
+    scales: Sequence[int],
+    repeat: int = 3,
+    pattern: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run the registered benchmarks at every scale inside a temporary working
+    directory (the handlers write under ./created/).
+
+    Returns:
+        Dict[str, Any]: {"commit", "date", "python", "machine", "repeat",
+        "results": {name: {scale: timing}}}.
+    """
+    benches = registered(pattern)
+    results: Dict[str, Dict[str, Any]] = {b.name: {} for b in benches}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            clear_results()
+            for scale in scales:
+                start = time.perf_counter()
+                dataset = make_dataset(scale)
+                print(f"-- x{scale}: dataset ready in {time.perf_counter() - start:.1f}s")
+                for bench in benches:
+                    timing = time_benchmark(bench, dataset, repeat)
+                    results[bench.name][str(scale)] = timing
+                    print(f"{bench.name:<44} x{scale:<4} median {timing['median']:9.4f}s   min {timing['min']:9.4f}s")
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpu)",
+        "repeat": repeat,
+        "results": results
+    }
+
+
+def save_results(report: Dict[str, Any], directory: Path = RESULTS_DIR) -> Path:
+    """
+    Write the report to <directory>/<commit>.json. A rerun on the same commit
+    only replaces the benchmarks / scales it measured (e.g. a `-k` run).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{report['commit']}.json"
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            merged = json.load(f)
+        for name, scales in report["results"].items():
+            merged["results"].setdefault(name, {}).update(scales)
+        report = {**report, "results": merged["results"]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def load_results(ref: str, directory: Path = RESULTS_DIR) -> Dict[str, Any]:
+    """Load a report by path or by commit (<directory>/<commit>.json)."""
+    path = Path(ref)
+    if not path.exists():
+        path = directory / f"{ref}.json"
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def latest_results(directory: Path = RESULTS_DIR) -> Optional[Path]:
+    files = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    return files[-1] if files else None
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Median of every benchmark/scale present in both reports.
+
+    Returns:
+        List[str]: Table lines; a REGRESSION mark when the new median is
+        slower by more than `threshold`, "faster" when quicker by as much.
+    """
+    lines = [f"{old['commit']} -> {new['commit']}",
+             f"{'benchmark':<44} {'scale':>6} {'old':>10} {'new':>10} {'change':>8}"]
+    for name, scales in new["results"].items():
+        for scale, timing in scales.items():
+            before = old["results"].get(name, {}).get(scale)
+            if before is None:
+                continue
+            change = timing["median"] / before["median"] - 1 if before["median"] else 0.0
+            mark = "REGRESSION" if change > threshold else ("faster" if change < -threshold else "")
+            lines.append(f"{name:<44} {'x' + scale:>6} {before['median']:10.4f} {timing['median']:10.4f} "
+                         f"{change:+8.1%} {mark}")
+    return lines
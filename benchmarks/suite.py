@@ -0,0 +1,215 @@
+#benchmarks/suite.py:
+
+import copy
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.runner import benchmark
+from dashboard.store import DashboardStore
+from data.basic.handler.csv_handler import append_race_tables, load_csv, load_race_tables, save_csv
+from data.basic.handler.json_handler import load_from_json, save_json
+from data.basic.handler.sqlite_handler import SQLiteHandler
+from data.basic.handler.summary_handler import DashboardSummary
+from data.basic.handler.xlsx_handler import load_race_results, load_xlsx, save_xlsx
+from data.basic.model_classes import Player, Race_Data, RaceResult
+from generators.player_generator import generate_players
+from generators.race_data_generator import generate_race_data
+from generators.race_result_generator import generate_laps, _update_ratings
+from generators.rng import RunSeeds
+from generators.season_simulator import schedule_season, simulate_season
+from main import PARTICIPANTS_PER_RACE, season_sheets
+
+# 1x = a main() alapértelmezett mérete
+BASE_PLAYERS = 32
+BASE_RACES = 231
+BENCH_SEED = 20251124
+
+# generate_laps változatok: (rajtrács mérete, körök száma, motor)
+LAP_VARIANTS = [(3, 5, "python"), (3, 30, "python"), (20, 5, "python"), (20, 30, "python"), (20, 30, "numpy")]
+
+
+@dataclass
+class Dataset:
+    """Seeded season of one scale; the inputs of the save / load / DB benchmarks."""
+    scale: int
+    players: List[Player]
+    races: List[Race_Data]
+    results: List[RaceResult]
+    # egyszer megírt bemeneti fájlok (a betöltő benchmarkokhoz)
+    written: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, scale: int, seed: int = BENCH_SEED) -> "Dataset":
+        seeds = RunSeeds(seed)
+        players = generate_players(BASE_PLAYERS * scale, rng=seeds.python("players"))
+        races = generate_race_data(BASE_RACES * scale, rng=seeds.numpy("calendar"))
+        schedule = schedule_season(players, races, participants_per_race=PARTICIPANTS_PER_RACE, seeds=seeds)
+        results = list(simulate_season(players, schedule, min_laps=3, max_laps=15, engine="numpy"))
+        return cls(scale, players, races, results)
+
+    def once(self, key: str, write) -> Any:
+        if key not in self.written:
+            self.written[key] = write()
+        return self.written[key]
+
+
+# --- generálás ---
+
+@benchmark("generate_players")
+def _generate_players(data: Dataset):
+    return lambda: generate_players(BASE_PLAYERS * data.scale, rng=random.Random(BENCH_SEED))
+
+
+@benchmark("generate_race_data")
+def _generate_race_data(data: Dataset):
+    return lambda: generate_race_data(BASE_RACES * data.scale, rng=RunSeeds(BENCH_SEED).numpy("calendar"))
+
+
+def _lap_benchmark(grid: int, laps: int, engine: str):
+    def setup(data: Dataset):
+        # versenyenként egy-egy rács a játékosok másolatából (a rating frissítés módosítja őket)
+        pool = copy.deepcopy(data.players)
+        grids = [[pool[(i * grid + j) % len(pool)] for j in range(grid)] for i in range(len(data.races))]
+        rng = random.Random(BENCH_SEED)
+
+        def run():
+            for rd, players in zip(data.races, grids):
+                generate_laps(rd, players, min_laps=laps, max_laps=laps, engine=engine, rng=rng)
+        return run
+    benchmark(f"generate_laps[grid={grid},laps={laps},{engine}]")(setup)
+
+
+for _grid, _laps, _engine in LAP_VARIANTS:
+    _lap_benchmark(_grid, _laps, _engine)
+
+
+@benchmark("_update_ratings")
+def _ratings(data: Dataset):
+    grids = [rr.participants for rr in data.results]
+
+    def run():
+        for participants in grids:
+            _update_ratings(participants)
+    return run
+
+
+# --- mentés / betöltés ---
+
+def _season_tables(data: Dataset) -> Dict[str, List[Dict[str, Any]]]:
+    tables: Dict[str, List[Dict[str, Any]]] = {"Races": [], "Participants": [], "Laps": []}
+    for rr in data.results:
+        for name, rows in season_sheets(rr).items():
+            tables[name].extend(rows)
+    return tables
+
+
+@benchmark("save_json[results]")
+def _save_json(data: Dataset):
+    return lambda: save_json(data.results, "bench_results.json")
+
+
+@benchmark("save_csv[players]")
+def _save_csv_players(data: Dataset):
+    return lambda: save_csv(data.players, "bench_players.csv")
+
+
+@benchmark("save_csv[race tables]")
+def _save_csv_tables(data: Dataset):
+    directory = Path("created/csvs/bench_tables")
+
+    def run():
+        for f in directory.glob("*.csv"):
+            f.unlink()
+        append_race_tables(data.results, "bench_tables")
+    return run
+
+
+@benchmark("save_xlsx[players]")
+def _save_xlsx_players(data: Dataset):
+    return lambda: save_xlsx({"Players": data.players}, "bench_players.xlsx", streaming=True)
+
+
+@benchmark("save_xlsx[season]")
+def _save_xlsx_season(data: Dataset):
+    tables = data.once("season_tables", lambda: _season_tables(data))
+    return lambda: save_xlsx(tables, "bench_season.xlsx", streaming=True)
+
+
+@benchmark("load_from_json[results]")
+def _load_json(data: Dataset):
+    data.once("json", lambda: save_json(data.results, "bench_load.json"))
+    return lambda: load_from_json("bench_load.json", RaceResult)
+
+
+@benchmark("load_csv[players]")
+def _load_csv_players(data: Dataset):
+    data.once("csv_players", lambda: save_csv(data.players, "bench_load_players.csv"))
+    return lambda: load_csv("bench_load_players.csv", Player)
+
+
+@benchmark("load_race_tables[csv]")
+def _load_csv_tables(data: Dataset):
+    data.once("csv_tables", lambda: append_race_tables(data.results, "bench_load_tables"))
+    return lambda: load_race_tables("bench_load_tables")
+
+
+@benchmark("load_xlsx[players]")
+def _load_xlsx_players(data: Dataset):
+    data.once("xlsx_players", lambda: save_xlsx({"Players": data.players}, "bench_load_players.xlsx", streaming=True))
+    return lambda: load_xlsx("bench_load_players.xlsx", "Players", Player)
+
+
+@benchmark("load_race_results[xlsx]")
+def _load_xlsx_results(data: Dataset):
+    tables = data.once("season_tables", lambda: _season_tables(data))
+    data.once("xlsx_season", lambda: save_xlsx(tables, "bench_load_season.xlsx", streaming=True))
+    return lambda: load_race_results("bench_load_season.xlsx")
+
+
+# --- adatbázis (SQLite, ugyanaz a betöltő kód, mint Oracle alatt) ---
+
+@benchmark("SQLHandler.insert_*[sqlite]")
+def _db_insert(data: Dataset):
+    handler = SQLiteHandler(path=f"bench_x{data.scale}.db")
+    handler.connect()
+    handler.clear_tables()
+    handler.create_schema()
+
+    def run():
+        handler.insert_players(data.players)
+        handler.insert_races(data.races)
+        handler.insert_results(data.results)
+        handler.commit()
+        handler.close()
+    return run
+
+
+# --- dashboard ---
+
+def _write_dashboard_files(data: Dataset) -> Path:
+    for rr in data.results:
+        save_json([rr], f"race_results/{rr.race_id}.json")
+    save_json(data.players, "players.json")
+    return Path("created/jsons")
+
+
+def _write_dashboard_summary(data: Dataset) -> Path:
+    summary = DashboardSummary()
+    for rr in data.results:
+        summary.add_race(rr)
+    summary.set_players(data.players)
+    return summary.save("bench_dashboard/dashboard_summary.json").parent
+
+
+@benchmark("DashboardStore.load[files]")
+def _dashboard_files(data: Dataset):
+    base = data.once("dashboard_files", lambda: _write_dashboard_files(data))
+    return lambda: DashboardStore(base)
+
+
+@benchmark("DashboardStore.load[summary]")
+def _dashboard_summary(data: Dataset):
+    base = data.once("dashboard_summary", lambda: _write_dashboard_summary(data))
+    return lambda: DashboardStore(base)
@@ -3,12 +3,11 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-import json
 import logging
 import uuid
 
 from functions.unix_to_timestamp import unix_to_ts
-from functions.unix_to_datetime import unix_to_dt
+from dashboard.store import DashboardStore
 
 # Optional Plotly
 use_plotly = True
@@ -24,72 +23,21 @@ logging.basicConfig(level=logging.INFO)
 
 # --- Paths ---
 BASE_JSON = Path(__file__).resolve().parent.parent / "created" / "jsons"
-RESULTS_DIR = BASE_JSON / "race_results"
-
-# --- Caching ---
-@st.cache_data
-def load_players():
-    try:
-        df = pd.read_json(BASE_JSON / "players.json")
-        return df if not df.empty else pd.DataFrame()
-    except Exception as e:
-        logging.error(f"Failed to load players.json: {e}")
-        return pd.DataFrame()
-
-@st.cache_data
-def load_participations():
-    rows = []
-    if not RESULTS_DIR.exists():
-        return pd.DataFrame()
-
-    race_files = sorted(RESULTS_DIR.glob("*.json"))
-    logging.info(f"Found {len(race_files)} race files")
-
-    for order, f in enumerate(race_files, start=1):
-        try:
-            with open(f, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
-                if not isinstance(data, list) or not data:
-                    continue
-
-                race = data[0]
-                race_id = race.get("race_id", f.stem)
-                date = race.get("timestamp", 0)
-                track = race.get("track", "Unknown")
-                layout = race.get("layout", "")
-                car_class = race.get("car_class", "")
-
-                participants = race.get("participants", [])
-
-                for p in participants:
-                    row = {
-                        "race_id": race_id,
-                        "Date": unix_to_dt(date),
-                        "timestamp": date,
-                        "race_order": order,
-                        "track": track,
-                        "layout": layout,
-                        "car_class": car_class,
-                        "username": p.get("username", ""),
-                        "start_position": p.get("start_position", 0),
-                        "finish_position": p.get("finish_position", 0),
-                        "incident_points": p.get("incident_points", 0),
-                        "total_time": p.get("total_time", ""),
-                        "new_rating": p.get("new_rating", 0),
-                        "new_rep": p.get("new_rep", 0),
-                    }
-                    rows.append(row)
-        except Exception as e:
-            logging.warning(f"Failed to load {f.name}: {e}")
-
-    df = pd.DataFrame(rows)
-    logging.info(
-        f"Loaded {len(df)} participation rows for {df['username'].nunique() if not df.empty else 0} unique players")
-    return df
-
-# Load data
-players_df = load_players()
-participations_df = load_participations()
+# élő frissítés: ennyi másodpercenként nézi meg, jöttek-e új versenyek
+LIVE_REFRESH_SECONDS = 5
+# ranglista lapméretek
+LEADERBOARD_PAGE_SIZES = [100, 250, 500]
+
+# --- Data access ---
+@st.cache_resource
+def get_store():
+    # egy store folyamatonként; a frissítést az adatfájlok mtime-ja vezérli
+    return DashboardStore(BASE_JSON)
+
+store = get_store()
+store.refresh()
+players_df = store.players
+participations_df = store.participations
 
 st.set_page_config(page_title="Race History App", layout="wide")
 st.title("Race History Dashboard 🏁🏎️")
@@ -156,14 +104,6 @@ def safe_aggrid(df, height=400, key=None, selectable=True):
         logging.error(f"AgGrid error: {e}")
         return {"selected_rows": []}
 
-def get_player_races(username):
-    if participations_df.empty:
-        return pd.DataFrame()
-    player_mask = participations_df['username'] == username
-    if not player_mask.any():
-        return pd.DataFrame()
-    return participations_df[player_mask].copy()
-
 # --- MAIN VIEWS ---
 col1, col2 = st.columns([1, 4])
 
@@ -178,6 +118,17 @@ with col1:
     if st.session_state.view != "lb" and st.session_state.selected_username:
         st.success(f"👤 {st.session_state.selected_username}")
 
+    # régebbi streamlit alatt (fragment nélkül) a frissítés csak újratöltéskor fut
+    if hasattr(st, "fragment"):
+        @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+        def live_refresh():
+            # csak az új sorokat olvassa be; változás esetén az egész oldal újrarajzolódik
+            if store.refresh():
+                st.rerun()
+            st.caption(f"🔴 Live · {store.total_races} races")
+
+        live_refresh()
+
 with col2:
     # Leaderboard View
     if st.session_state.view == "lb":
@@ -190,17 +141,44 @@ with col2:
             with col_a:
                 st.metric("Total Players", len(players_df))
             # JAVÍTOTT: Egyedi race-ek száma (nem participants)
-            unique_races = len(participations_df['race_id'].unique()) if not participations_df.empty else 0
+            unique_races = store.total_races
             with col_b:
                 st.metric("Total Races", unique_races)
 
-            lb_cols = ["username", "full_name", "elo_rating", "reputation", "race_count"]
-            available_cols = [col for col in lb_cols if col in players_df.columns]
-            lb_df = players_df[available_cols].sort_values(
-                by=["elo_rating", "reputation"], ascending=[False, False], na_position='last'
-            ).head(100).reset_index(drop=True)
+            rank_index = store.rank_index
+
+            # szűrők: nemzetiség / csapat / kategória ("All" = nincs szűrés)
+            filter_cols = st.columns(3)
+            filters = {}
+            for fcol, (column, label) in zip(filter_cols, [
+                ("nationality", "Nationality"), ("team", "Team"), ("car_class", "Car class")
+            ]):
+                with fcol:
+                    choice = st.selectbox(label, ["All"] + rank_index.values(column), key=f"lb_filter_{column}")
+                filters[column] = None if choice == "All" else choice
+
+            # szerveroldali lapozás: csak az aktuális oldal megy az AgGrid-nek
+            total = rank_index.count(**filters)
+            page_col, size_col, find_col = st.columns(3)
+            with size_col:
+                page_size = st.selectbox("Page size", LEADERBOARD_PAGE_SIZES, key="lb_page_size")
+            pages = max(1, -(-total // page_size))
+            with page_col:
+                page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key="lb_page")
+            with find_col:
+                find = st.text_input("Find player rank", key="lb_find").strip()
+            if find:
+                found = rank_index.filtered_rank(find, **filters)
+                if found is None:
+                    st.warning(f"{find} is not on this leaderboard.")
+                else:
+                    st.info(f"{find}: #{found} (page {(found - 1) // page_size + 1}), global #{rank_index.rank(find)}")
+
+            lb_cols = ["rank", "username", "full_name", "elo_rating", "reputation", "race_count"]
+            page_df = rank_index.page((int(page) - 1) * page_size, page_size, **filters)
+            lb_df = page_df[[col for col in lb_cols if col in page_df.columns]]
 
-            grid_resp = safe_aggrid(lb_df, height=500, selectable=True, key="leaderboard_grid")
+            grid_resp = safe_aggrid(lb_df, height=500, selectable=True, key=f"leaderboard_grid_{page}_{page_size}")
 
             selected_rows = normalize_selected_rows(grid_resp)
             if len(selected_rows) > 0:
@@ -214,25 +192,26 @@ with col2:
 
         st.header(f"👤 {username}'s Career")
 
-        player_races = get_player_races(username)
+        player_races = store.player_races(username)
 
         if player_races.empty:
             st.warning(f"❌ No race data found for {username}")
         else:
             # MÓDOSÍTOTT: Új sorrend - Rating, Rep, Race Count, Avg Finish
+            career = store.career(username)
+            current_rating = career["rating"]
+            current_rep = career["reputation"]
+            race_count = career["race_count"]
+            avg_finish = career["avg_finish"]
+
             col_stats1, col_stats2, col_stats3, col_stats4 = st.columns(4)
             with col_stats1:
-                # Rating - legutóbbi rating
-                current_rating = player_races['new_rating'].iloc[-1] if not player_races.empty else 0
                 st.metric("Rating", f"{current_rating:.0f}" if current_rating else "N/A")
             with col_stats2:
-                # Rep - legutóbbi rep
-                current_rep = player_races['new_rep'].iloc[-1] if not player_races.empty else 0
                 st.metric("Reputation", f"{current_rep:.0f}" if current_rep else "N/A")
             with col_stats3:
-                st.metric("Race Count", len(player_races))
+                st.metric("Race Count", race_count)
             with col_stats4:
-                avg_finish = player_races['finish_position'].mean()
                 st.metric("Avg. Finish", f"{avg_finish:.1f}" if not pd.isna(avg_finish) else "N/A")
 
             st.subheader("📋 Race History")
@@ -250,24 +229,21 @@ with col2:
             # Laps detail
             if st.session_state.selected_race_id:
                 st.subheader("⏱️ Lap Details")
-                race_file = RESULTS_DIR / f"{st.session_state.selected_race_id}.json"
-
-                if race_file.exists():
-                    try:
-                        with open(race_file, "r", encoding="utf-8") as f:
-                            race_data = json.load(f)[0]
+                try:
+                    laps = store.race_laps(st.session_state.selected_race_id, username)
 
+                    if laps is None:
+                        st.warning(f"Race not found: {st.session_state.selected_race_id}")
+                    else:
                         laps_data = []
-                        for participant in race_data.get("participants", []):
-                            if participant.get("username") == username:
-                                for lap in participant.get("laps", []):
-                                    lap_time = unix_to_ts(lap.get("time", 0))
-                                    laps_data.append({
-                                        "lap": lap.get("lap", 0),
-                                        "time": lap_time,
-                                        "position": lap.get("position", ""),
-                                        "incidents": ", ".join(lap.get("incidents", []))
-                                    })
+                        for lap in laps:
+                            lap_time = unix_to_ts(lap.get("time", 0))
+                            laps_data.append({
+                                "lap": lap.get("lap", 0),
+                                "time": lap_time,
+                                "position": lap.get("position", ""),
+                                "incidents": ", ".join(lap.get("incidents", []))
+                            })
 
                         if laps_data:
                             laps_df = pd.DataFrame(laps_data)
@@ -276,10 +252,8 @@ with col2:
                         else:
                             st.info("No lap data available.")
 
-                    except Exception as e:
-                        st.error(f"Error loading race data: {e}")
-                else:
-                    st.warning(f"Race file not found: {race_file}")
+                except Exception as e:
+                    st.error(f"Error loading race data: {e}")
 
         if st.button("🔙 Back to Leaderboard", key="back_btn"):
             st.session_state.view = "lb"
@@ -0,0 +1,171 @@
+#/dashboard/rank_index.py:
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ezek szerint lehet szűrni (car_class a részvételekből jön)
+FILTER_COLUMNS = ("nationality", "team", "car_class")
+
+
+class RankIndex:
+    """
+    Rank order of the players, built once per dataset version.
+
+    The players are ordered once by (elo_rating, reputation) descending, or
+    taken in the stored order if the frame already has a `rank` column (the
+    generation-time leaderboard). After that:
+
+    - `rank(username)` is a dict lookup, `rank_of(elo, rep)` a bisect over
+      the sorted score keys (O(log n));
+    - `page(offset, limit)` slices any rank window without sorting;
+    - filters (nationality, team, car_class) are sorted position arrays,
+      built on first use and cached, so a filtered page is a slice too.
+    """
+
+    def __init__(self, players: pd.DataFrame, participations: Optional[pd.DataFrame] = None):
+        self._participations = participations
+        if players.empty:
+            self.ordered = players
+            self._keys: List[Tuple[float, float]] = []
+            self._pos: Dict[str, int] = {}
+            self._filters: Dict[Tuple[str, str], np.ndarray] = {}
+            self._combined: Dict[tuple, np.ndarray] = {}
+            return
+
+        if "rank" in players.columns:
+            order = np.argsort(players["rank"].to_numpy(), kind="stable")
+        else:
+            # lexsort: az utolsó kulcs az elsődleges; NaN a végére kerül
+            elo = players["elo_rating"].to_numpy(dtype=float)
+            rep = players["reputation"].to_numpy(dtype=float)
+            order = np.lexsort((-rep, -elo))
+        ordered = players.iloc[order].reset_index(drop=True)
+        ordered["rank"] = np.arange(1, len(ordered) + 1)
+        self.ordered = ordered
+
+        # bisect kulcsok: növekvő (-elo, -rep); NaN helyett +inf, hogy a végén maradjon
+        elo = np.nan_to_num(-ordered["elo_rating"].to_numpy(dtype=float), nan=np.inf)
+        rep = np.nan_to_num(-ordered["reputation"].to_numpy(dtype=float), nan=np.inf)
+        self._keys = list(zip(elo.tolist(), rep.tolist()))
+        self._pos = {u: i for i, u in enumerate(ordered["username"])}
+        self._filters = {}
+        self._combined = {}
+
+    def __len__(self) -> int:
+        return len(self.ordered)
+
+    # --- rangsor lekérdezés ---
+
+    def rank(self, username: str) -> Optional[int]:
+        """
+        Returns:
+            Optional[int]: 1-based rank of the player, None if unknown.
+        """
+        pos = self._pos.get(username)
+        return pos + 1 if pos is not None else None
+
+    def rank_of(self, elo_rating: float, reputation: float) -> int:
+        """
+        Rank a player with this rating / reputation would have (ties share
+        the best rank).
+
+        Returns:
+            int: 1-based rank.
+        """
+        return bisect_left(self._keys, (-elo_rating, -reputation)) + 1
+
+    # --- szűrők ---
+
+    def values(self, column: str) -> List[str]:
+        """Distinct values of a filter column (for the filter widgets)."""
+        if column == "car_class":
+            source = self._participations
+        else:
+            source = self.ordered
+        if source is None or source.empty or column not in source.columns:
+            return []
+        return sorted(v for v in source[column].dropna().unique() if v != "")
+
+    def _positions(self, column: str, value: str) -> np.ndarray:
+        key = (column, value)
+        positions = self._filters.get(key)
+        if positions is not None:
+            return positions
+
+        if column == "car_class":
+            # aki legalább egy versenyt futott ebben a kategóriában
+            parts = self._participations
+            if parts is None or parts.empty:
+                positions = np.empty(0, dtype=np.int64)
+            else:
+                usernames = parts.loc[parts["car_class"] == value, "username"].unique()
+                positions = np.sort(np.fromiter(
+                    (self._pos[u] for u in usernames if u in self._pos), dtype=np.int64))
+        elif column in self.ordered.columns:
+            positions = np.flatnonzero(self.ordered[column].to_numpy() == value)
+        else:
+            positions = np.empty(0, dtype=np.int64)
+        self._filters[key] = positions
+        return positions
+
+    def _select(self, filters: Dict[str, Optional[str]]) -> Optional[np.ndarray]:
+        # None = nincs szűrés (a teljes rangsor)
+        active = [(column, filters[column]) for column in FILTER_COLUMNS if filters.get(column)]
+        if not active:
+            return None
+        if len(active) == 1:
+            return self._positions(*active[0])
+
+        # szűrő-kombináció: a metszet is gyorsítótárazva (lapozáskor ugyanaz)
+        key = tuple(active)
+        selected = self._combined.get(key)
+        if selected is None:
+            selected = self._positions(*active[0])
+            for column, value in active[1:]:
+                selected = np.intersect1d(selected, self._positions(column, value), assume_unique=True)
+            self._combined[key] = selected
+        return selected
+
+    def count(self, **filters: Optional[str]) -> int:
+        """
+        Returns:
+            int: Number of players matching the filters.
+        """
+        selected = self._select(filters)
+        return len(self.ordered) if selected is None else len(selected)
+
+    def page(self, offset: int = 0, limit: int = 100, **filters: Optional[str]) -> pd.DataFrame:
+        """
+        One rank window of the (filtered) leaderboard.
+
+        Args:
+            offset (int): 0-based position within the filtered leaderboard.
+            limit (int): Page size.
+            **filters: nationality / team / car_class values (None = any).
+
+        Returns:
+            pd.DataFrame: The rows in rank order; `rank` is the global rank.
+        """
+        offset = max(0, offset)
+        selected = self._select(filters)
+        if selected is None:
+            return self.ordered.iloc[offset:offset + limit].reset_index(drop=True)
+        return self.ordered.iloc[selected[offset:offset + limit]].reset_index(drop=True)
+
+    def filtered_rank(self, username: str, **filters: Optional[str]) -> Optional[int]:
+        """
+        Returns:
+            Optional[int]: 1-based rank within the filtered leaderboard, None if
+            the player is unknown or filtered out.
+        """
+        pos = self._pos.get(username)
+        if pos is None:
+            return None
+        selected = self._select(filters)
+        if selected is None:
+            return pos + 1
+        i = int(np.searchsorted(selected, pos))
+        return i + 1 if i < len(selected) and selected[i] == pos else None
@@ -0,0 +1,434 @@
+#/dashboard/store.py:
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from functions.unix_to_datetime import unix_to_dt
+from data.basic.handler.json_handler import load_jsonl_index, read_jsonl_record, read_jsonl_tail
+from data.basic.handler.summary_handler import SUMMARY_FILE, load_summary
+from dashboard.rank_index import RankIndex
+
+# ennyi verseny köradatai maradnak a memóriában (LRU)
+RACE_CACHE_SIZE = 128
+# a hozzáfűzött (még nem rendezett) sorok aránya, ami felett újrarendezünk
+COMPACT_FRACTION = 0.25
+COMPACT_MIN_ROWS = 1000
+
+
+def _participation_rows(race, order, fallback_id=""):
+    race_id = race.get("race_id", fallback_id)
+    date = race.get("timestamp", 0)
+    track = race.get("track", "Unknown")
+    layout = race.get("layout", "")
+    car_class = race.get("car_class", "")
+
+    rows = []
+    for p in race.get("participants", []):
+        rows.append({
+            "race_id": race_id,
+            "Date": unix_to_dt(date),
+            "timestamp": date,
+            "race_order": order,
+            "track": track,
+            "layout": layout,
+            "car_class": car_class,
+            "username": p.get("username", ""),
+            "start_position": p.get("start_position", 0),
+            "finish_position": p.get("finish_position", 0),
+            "incident_points": p.get("incident_points", 0),
+            "total_time": p.get("total_time", ""),
+            "new_rating": p.get("new_rating", 0),
+            "new_rep": p.get("new_rep", 0),
+        })
+    return rows
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _covered_log_prefix(index: Dict[str, Tuple[int, int]], covered: set) -> int:
+    """
+    End offset of the leading log records that are all in `covered` (read
+    from the log index, not the log): reading resumes at the first record
+    the summary does not include.
+    """
+    offset = 0
+    for key, (start, length) in sorted(index.items(), key=lambda item: item[1][0]):
+        if start != offset or key not in covered:
+            break
+        offset = start + length
+    return offset
+
+
+class DashboardStore:
+    """
+    Data-access layer of the dashboard.
+
+    Holds the players / participations / careers frames with two indexes:
+    username -> row range of the participations (sorted by username, then
+    time) and race_id -> row positions. Parsed race lap data sits in a
+    bounded LRU cache; every entry remembers the mtime/offset of its source
+    and is re-read when that changes.
+
+    `refresh` is cheap to call on every rerun or from a polling loop: a
+    changed summary / players file triggers a full reload, while new races
+    (log lines after the last read offset, or race files not seen yet) are
+    only appended. Appended rows go to a per-player tail next to the sorted
+    ranges, the leaderboard and career figures of the affected players are
+    updated in place, and the tails are merged into the sorted block once
+    they grow past COMPACT_FRACTION of the rows.
+    """
+
+    def __init__(self, base_json: Path, race_cache_size: int = RACE_CACHE_SIZE):
+        self.base_json = Path(base_json)
+        self.results_dir = self.base_json / "race_results"
+        # JSON Lines mód: egyetlen log + byte-offset index a versenyfájlok helyett
+        self.results_log = self.results_dir / "race_results.jsonl"
+        self.summary_path = self.base_json / SUMMARY_FILE
+        self.race_cache_size = race_cache_size
+
+        self.players = pd.DataFrame()
+        self.participations = pd.DataFrame()
+        self.careers = pd.DataFrame()
+        self._user_rows: Dict[str, Tuple[int, int]] = {}
+        self._user_tail: Dict[str, List[int]] = {}
+        self._tail_rows = 0
+        self._race_rows: Dict[str, np.ndarray] = {}
+        self._player_pos: Dict[str, int] = {}
+        self._last_ts: Dict[str, int] = {}
+        self._log_index: Dict[str, Tuple[int, int]] = {}
+        self._races: "OrderedDict[str, Tuple[Any, Dict[str, Any]]]" = OrderedDict()
+        # rangsor index: adatverziónként egyszer épül (lásd rank_index)
+        self._rank_index: Optional[RankIndex] = None
+
+        # már beolvasott források
+        self._base_version: Optional[tuple] = None
+        self._results_version: Optional[tuple] = None
+        self._log_offset = 0
+        self._seen_files: set = set()
+        self._pending_files: set = set()
+        self._next_order = 1
+
+        # a store-t a streamlit munkamenetek szálai közösen használják
+        self._lock = threading.RLock()
+        self.refresh()
+
+    # --- verzió / betöltés ---
+
+    def _base_key(self) -> tuple:
+        # új log (új szezon) = új inode: az is teljes újratöltés
+        log_ino = self.results_log.stat().st_ino if self.results_log.exists() else None
+        return _stat_key(self.summary_path), _stat_key(self.base_json / "players.json"), log_ino
+
+    def _results_key(self) -> tuple:
+        return _stat_key(self.results_log), _stat_key(self.results_dir)
+
+    def refresh(self) -> bool:
+        """
+        Bring the frames up to date with the data files.
+
+        Returns:
+            bool: True if anything changed (full reload or new races).
+        """
+        with self._lock:
+            base = self._base_key()
+            if base != self._base_version:
+                self.reload()
+                self._base_version = base
+                self._ingest_new()
+                return True
+            return self._ingest_new() > 0
+
+    def reload(self) -> None:
+        summary = None
+        try:
+            summary = load_summary(self.summary_path)
+        except Exception as e:
+            logging.error(f"Failed to load {self.summary_path.name}: {e}")
+
+        self._log_index = load_jsonl_index(self.results_log.name, self.results_dir) if self.results_log.exists() else {}
+        self._results_version = None
+        self._pending_files = set()
+
+        if summary is not None:
+            # előre számolt összesítő (ranglista sorrendben); a már meglévő
+            # versenyforrásokat nem olvassuk újra, csak az ezután érkezőket
+            self._set_players(pd.DataFrame(summary["leaderboard"]))
+            participations = pd.DataFrame(summary["participations"])
+            careers = pd.DataFrame(summary["careers"])
+            self.careers = careers.set_index("username") if not careers.empty else careers
+            self._last_ts = dict(zip(careers["username"], careers["last_timestamp"])) if not careers.empty else {}
+            covered = set(summary["races"])
+            self._log_offset = _covered_log_prefix(self._log_index, covered)
+            self._seen_files = {f"{race_id}.json" for race_id in covered}
+            self._next_order = int(participations["race_order"].max()) + 1 if not participations.empty else 1
+        else:
+            # összesítő nélkül minden verseny a növekményes úton jön be
+            self._set_players(self._load_players())
+            participations = pd.DataFrame()
+            self.careers = pd.DataFrame()
+            self._last_ts = {}
+            self._log_offset = 0
+            self._seen_files = set()
+            self._next_order = 1
+
+        self._set_participations(participations)
+
+    def _load_players(self) -> pd.DataFrame:
+        try:
+            df = pd.read_json(self.base_json / "players.json")
+            return df if not df.empty else pd.DataFrame()
+        except Exception as e:
+            logging.error(f"Failed to load players.json: {e}")
+            return pd.DataFrame()
+
+    def _set_players(self, df: pd.DataFrame) -> None:
+        self.players = df.reset_index(drop=True)
+        self._rank_index = None
+        self._player_pos = {u: i for i, u in enumerate(df["username"])} if "username" in df.columns else {}
+
+    def _set_participations(self, df: pd.DataFrame) -> None:
+        self._user_rows = {}
+        self._user_tail = {}
+        self._tail_rows = 0
+        self._race_rows = {}
+        if df.empty:
+            self.participations = df
+            return
+
+        # username, azon belül idő szerint: egy játékos sorai egy összefüggő tartomány
+        df = df.sort_values(["username", "timestamp"], kind="stable").reset_index(drop=True)
+        usernames = df["username"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, usernames[1:] != usernames[:-1]])
+        ends = np.r_[starts[1:], len(df)]
+        self._user_rows = {usernames[s]: (int(s), int(e)) for s, e in zip(starts, ends)}
+        self._race_rows = df.groupby("race_id", sort=False).indices
+        self.participations = df
+
+    # --- növekményes frissítés ---
+
+    def _read_new_races(self) -> List[Tuple[Dict[str, Any], str]]:
+        races = []
+        if self.results_log.exists():
+            records, self._log_offset = read_jsonl_tail(self.results_log.name, self._log_offset, self.results_dir)
+            races.extend((race, "") for race in records)
+            return races
+
+        if not self.results_dir.exists():
+            return races
+        new_files = {f.name for f in self.results_dir.glob("*.json")} - self._seen_files
+        for name in sorted(new_files | self._pending_files):
+            f = self.results_dir / name
+            try:
+                with open(f, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except Exception as e:
+                # még íródik: a következő körben újra
+                logging.debug(f"Skipping {name} for now: {e}")
+                self._pending_files.add(name)
+                continue
+            self._pending_files.discard(name)
+            self._seen_files.add(name)
+            if isinstance(data, list) and data:
+                races.append((data[0], f.stem))
+        return races
+
+    def _ingest_new(self) -> int:
+        """Append the races written since the last call; returns their number."""
+        results = self._results_key()
+        if results == self._results_version and not self._pending_files:
+            return 0
+        self._results_version = results
+
+        rows = []
+        count = 0
+        for race, fallback_id in self._read_new_races():
+            race_id = race.get("race_id", fallback_id)
+            if race_id in self._race_rows:
+                continue
+            rows.extend(_participation_rows(race, self._next_order, fallback_id))
+            self._next_order += 1
+            count += 1
+        if rows:
+            self._append_participations(pd.DataFrame(rows))
+            logging.info(f"Ingested {count} new races ({len(rows)} participation rows)")
+        return count
+
+    def _append_participations(self, new: pd.DataFrame) -> None:
+        base = len(self.participations)
+        self.participations = pd.concat([self.participations, new], ignore_index=True)
+
+        race_rows: Dict[str, List[int]] = {}
+        for pos, (username, race_id) in enumerate(zip(new["username"], new["race_id"]), start=base):
+            self._user_tail.setdefault(username, []).append(pos)
+            race_rows.setdefault(race_id, []).append(pos)
+        for race_id, positions in race_rows.items():
+            self._race_rows[race_id] = np.array(positions)
+        self._tail_rows += len(new)
+        self._rank_index = None
+
+        self._update_figures(new)
+        if self._tail_rows > max(COMPACT_MIN_ROWS, COMPACT_FRACTION * len(self.participations)):
+            self._set_participations(self.participations)
+
+    def _update_figures(self, new: pd.DataFrame) -> None:
+        """Update the leaderboard and career rows of the players in `new`."""
+        has_careers = not self.careers.empty
+        players_changed = False
+        for row in new.sort_values("timestamp", kind="stable").itertuples(index=False):
+            username, ts = row.username, row.timestamp
+            is_latest = ts >= self._last_ts.get(username, -1)
+            if is_latest:
+                self._last_ts[username] = ts
+
+            pos = self._player_pos.get(username)
+            if pos is not None and is_latest:
+                self.players.at[pos, "elo_rating"] = row.new_rating
+                self.players.at[pos, "reputation"] = row.new_rep
+                players_changed = True
+            if pos is not None and "race_count" in self.players.columns:
+                start, end = self._user_rows.get(username, (0, 0))
+                known = end - start + len(self._user_tail.get(username, ()))
+                self.players.at[pos, "race_count"] = max(int(self.players.at[pos, "race_count"]), known)
+
+            if has_careers and username in self.careers.index:
+                c = self.careers.loc[username]
+                count = int(c["race_count"]) + 1
+                finish_sum = int(c["finish_sum"]) + row.finish_position
+                self.careers.loc[username, ["race_count", "avg_finish", "finish_sum", "wins", "podiums", "incident_points"]] = [
+                    count,
+                    round(finish_sum / count, 3),
+                    finish_sum,
+                    c["wins"] + (row.finish_position == 1),
+                    c["podiums"] + (row.finish_position <= 3),
+                    c["incident_points"] + row.incident_points
+                ]
+                if is_latest:
+                    self.careers.loc[username, ["rating", "reputation", "last_timestamp"]] = \
+                        [row.new_rating, row.new_rep, ts]
+
+        if players_changed and "rank" in self.players.columns:
+            # a tárolt rangsor elavult: a rank index újrarendez a következő lekérdezéskor
+            self.players = self.players.drop(columns="rank")
+
+    # --- lekérdezések ---
+
+    @property
+    def rank_index(self) -> RankIndex:
+        with self._lock:
+            if self._rank_index is None:
+                self._rank_index = RankIndex(self.players, self.participations)
+            return self._rank_index
+
+    # a sortartományok és a participations frame együtt cserélődnek (tömörítés
+    # egy másik munkamenet frissítésében): olvasás is csak a lock alatt
+
+    @property
+    def total_races(self) -> int:
+        with self._lock:
+            return len(self._race_rows)
+
+    def player_races(self, username: str) -> pd.DataFrame:
+        """A player's participations in time order (one slice, no scan)."""
+        with self._lock:
+            rows = self._user_rows.get(username)
+            tail = self._user_tail.get(username)
+            if rows is None and not tail:
+                return pd.DataFrame()
+            if not tail:
+                return self.participations.iloc[rows[0]:rows[1]]
+            # rendezett tartomány + az azóta hozzáfűzött sorok
+            start, end = rows or (0, 0)
+            return self.participations.iloc[np.r_[np.arange(start, end), tail]].sort_values("timestamp", kind="stable")
+
+    def race_participants(self, race_id: str) -> pd.DataFrame:
+        with self._lock:
+            rows = self._race_rows.get(race_id)
+            if rows is None:
+                return pd.DataFrame()
+            return self.participations.iloc[rows]
+
+    def career(self, username: str) -> Optional[Dict[str, Any]]:
+        """Rating, reputation, race count and average finish of a player."""
+        with self._lock:
+            if username in self.careers.index:
+                c = self.careers.loc[username]
+                return {
+                    "rating": c["rating"],
+                    "reputation": c["reputation"],
+                    "race_count": int(c["race_count"]),
+                    "avg_finish": c["avg_finish"]
+                }
+            races = self.player_races(username)
+        if races.empty:
+            return None
+        # idő szerint rendezett: az utolsó sor a legutóbbi verseny
+        return {
+            "rating": races["new_rating"].iloc[-1],
+            "reputation": races["new_rep"].iloc[-1],
+            "race_count": len(races),
+            "avg_finish": races["finish_position"].mean()
+        }
+
+    # --- versenyek köradatai (LRU) ---
+
+    def _race_source(self, race_id: str) -> Any:
+        if self.results_log.exists():
+            entry = self._log_index.get(race_id)
+            if entry is None:
+                # azóta hozzáfűzött verseny: az index újraolvasása
+                self._log_index = load_jsonl_index(self.results_log.name, self.results_dir)
+                entry = self._log_index.get(race_id)
+            # a log rekordjai nem változnak; új log (új szezon) = új inode
+            return None if entry is None else ("log", self.results_log.stat().st_ino, entry)
+        key = _stat_key(self.results_dir / f"{race_id}.json")
+        return None if key is None else ("file", key)
+
+    def race(self, race_id: str) -> Optional[Dict[str, Any]]:
+        """Full race data (participants with laps), cached while its source is unchanged."""
+        source = self._race_source(race_id)
+        if source is None:
+            with self._lock:
+                self._races.pop(race_id, None)
+            return None
+
+        with self._lock:
+            cached = self._races.get(race_id)
+            if cached is not None and cached[0] == source:
+                self._races.move_to_end(race_id)
+                return cached[1]
+
+        if source[0] == "log":
+            data = read_jsonl_record(self.results_log.name, race_id, self._log_index, self.results_dir)
+        else:
+            with open(self.results_dir / f"{race_id}.json", "r", encoding="utf-8") as f:
+                data = json.load(f)[0]
+
+        with self._lock:
+            self._races[race_id] = (source, data)
+            self._races.move_to_end(race_id)
+            while len(self._races) > self.race_cache_size:
+                self._races.popitem(last=False)
+        return data
+
+    def race_laps(self, race_id: str, username: str) -> Optional[List[Dict[str, Any]]]:
+        """The laps of one participant, or None if the race is not found."""
+        data = self.race(race_id)
+        if data is None:
+            return None
+        for participant in data.get("participants", []):
+            if participant.get("username") == username:
+                return participant.get("laps", [])
+        return []
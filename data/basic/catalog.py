@@ -0,0 +1,88 @@
+#data/basic/catalog.py:
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+from data.basic.model_classes import Race_Data
+
+DATA_DIR = Path(__file__).parent.parent / "raw"
+
+# becsült versenyhossz: 1. kör 1.10x, többi 1.05x, átlagosan 8 kör
+ESTIMATED_LAPS = 8
+
+LapKey = Tuple[str, str, str]
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _read_json(name: str) -> Any:
+    with open(DATA_DIR / name, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _estimate_duration_ms(best_lap_ms: int) -> int:
+    return int(best_lap_ms * 1.10) + int(best_lap_ms * 1.05) * (ESTIMATED_LAPS - 1)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """
+    Immutable, in-memory view of every file under data/raw.
+
+    The lap-time and duration indexes are precomputed once, so lookups in the
+    race loop are plain dict hits instead of JSON parsing and list scans.
+    """
+    cars: Mapping[str, Any]
+    tracks: Mapping[str, Any]
+    reference_laps: Mapping[str, Any]
+    incidents: Mapping[str, Any]
+    locale_map: Mapping[str, str]
+    best_lap_index: Mapping[LapKey, int]
+    duration_index: Mapping[LapKey, int]
+
+    @classmethod
+    def load(cls) -> "Catalog":
+        reference_laps = _read_json("reference_laps.json")
+
+        best_laps: Dict[LapKey, int] = {}
+        for track, layouts in reference_laps.items():
+            for layout, layout_data in layouts.items():
+                for car_class, ms in zip(layout_data["car_class"], layout_data["best_lap_ms"]):
+                    best_laps[(track, layout, car_class)] = ms
+
+        durations = {key: _estimate_duration_ms(ms) for key, ms in best_laps.items()}
+
+        return cls(
+            cars=_freeze(_read_json("cars.json")),
+            tracks=_freeze(_read_json("tracks.json")),
+            reference_laps=_freeze(reference_laps),
+            incidents=_freeze(_read_json("incidents.json")),
+            locale_map=_freeze(_read_json("locale_map.json")),
+            best_lap_index=MappingProxyType(best_laps),
+            duration_index=MappingProxyType(durations),
+        )
+
+    def best_lap_ms(self, rd: Race_Data) -> int:
+        """Reference best lap (ms) for the race's track, layout and car class."""
+        return self.best_lap_index[(rd.track, rd.layout, rd.car_class)]
+
+    def estimated_duration_ms(self, rd: Race_Data) -> int:
+        """Estimated race duration (ms) based on the reference lap."""
+        return self.duration_index[(rd.track, rd.layout, rd.car_class)]
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> Catalog:
+    """Process-wide catalog, loaded on first use."""
+    return Catalog.load()
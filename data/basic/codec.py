@@ -0,0 +1,174 @@
+#data/basic/codec.py:
+
+import dataclasses
+import typing
+from typing import Any, Callable, Dict, List, Tuple, Type, TypeVar
+
+from data.basic import model_classes
+from data.basic.model_classes import LapBlock, LapView, decode_incidents
+
+T = TypeVar("T")
+
+# (típus, elem) leírás: ("prim", None) | ("dc", cls) | ("list", kind) | ("dict", kind)
+Kind = Tuple[str, Any]
+
+# a generált függvények közös névtere: egymást globálisként hívják
+_NAMESPACE: Dict[str, Any] = {}
+ENCODERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+DECODERS: Dict[type, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def encode_lap_block(block: LapBlock) -> List[Dict[str, Any]]:
+    """Encode a `LapBlock` column-wise (no `LapView` per lap)."""
+    return [
+        {"lap": i, "time": t, "valid": bool(v), "position": p or None,
+         "incidents": decode_incidents(c) if c else []}
+        for i, (t, v, p, c) in enumerate(
+            zip(block.times, block.valid, block.positions, block.incident_codes), start=1)
+    ]
+
+
+_NAMESPACE["LapBlock"] = LapBlock
+_NAMESPACE["encode_lap_block"] = encode_lap_block
+
+
+def _kind(tp: Any) -> Kind:
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if dataclasses.is_dataclass(tp):
+        return ("dc", tp)
+    if origin is typing.Union:
+        # pl. Union[List[Lap], LapBlock] -> a lista ág írja le a formát
+        for arg in args:
+            if typing.get_origin(arg) in (list, tuple) or dataclasses.is_dataclass(arg):
+                return _kind(arg)
+        return ("prim", None)
+    if origin in (list, tuple) and args:
+        return ("list", _kind(args[0]))
+    if origin is dict and len(args) == 2:
+        return ("dict", _kind(args[1]))
+    return ("prim", None)
+
+
+def _encode_expr(kind: Kind, src: str, depth: int = 0) -> str:
+    tag, inner = kind
+    var = f"v{depth}"
+    if tag == "dc":
+        return f"encode_{inner.__name__}({src})"
+    if tag == "list":
+        if inner[0] == "prim":
+            return f"list({src})"
+        expr = f"[{_encode_expr(inner, var, depth + 1)} for {var} in {src}]"
+        if inner == ("dc", model_classes.Lap):
+            # tömör kör-tárolás: oszloponkénti kódolás
+            expr = f"(encode_lap_block({src}) if type({src}) is LapBlock else {expr})"
+        return expr
+    if tag == "dict":
+        if inner[0] == "prim":
+            return f"dict({src})"
+        return f"{{k{depth}: {_encode_expr(inner, var, depth + 1)} for k{depth}, {var} in {src}.items()}}"
+    return src
+
+
+def _decode_expr(kind: Kind, src: str, depth: int = 0) -> str:
+    tag, inner = kind
+    var = f"v{depth}"
+    if tag == "dc":
+        return f"decode_{inner.__name__}({src})"
+    if tag == "list":
+        if inner[0] == "prim":
+            return f"list({src})"
+        return f"[{_decode_expr(inner, var, depth + 1)} for {var} in {src}]"
+    if tag == "dict":
+        if inner[0] == "prim":
+            return f"dict({src})"
+        return f"{{k{depth}: {_decode_expr(inner, var, depth + 1)} for k{depth}, {var} in {src}.items()}}"
+    return src
+
+
+def _nested_dataclasses(kind: Kind):
+    tag, inner = kind
+    if tag == "dc":
+        yield inner
+    elif tag in ("list", "dict"):
+        yield from _nested_dataclasses(inner)
+
+
+def compile_codec(cls: type) -> None:
+    """
+    Generate and register a specialized encoder/decoder pair for a dataclass.
+
+    The encoder is a single dict literal over the fields (nested dataclasses,
+    lists and dicts expanded inline), the decoder a single constructor call,
+    so neither walks the type at runtime like `dataclasses.asdict` does.
+    """
+    hints = typing.get_type_hints(cls)
+    name = cls.__name__
+    _NAMESPACE[name] = cls
+
+    for f in dataclasses.fields(cls):
+        for nested in _nested_dataclasses(_kind(hints[f.name])):
+            if nested is not cls and nested not in ENCODERS:
+                compile_codec(nested)
+
+    enc_items = []
+    dec_args = []
+    for f in dataclasses.fields(cls):
+        if not f.metadata.get("export", True):
+            # csak memóriában élő mező (pl. RaceResult.timeline): kimarad, dekódoláskor alapérték
+            continue
+        kind = _kind(hints[f.name])
+        enc_items.append(f"{f.name!r}: {_encode_expr(kind, f'o.{f.name}')}")
+
+        if f.default is not dataclasses.MISSING:
+            default_name = f"_default_{name}_{f.name}"
+            _NAMESPACE[default_name] = f.default
+            value = f"d[{f.name!r}] if {f.name!r} in d else {default_name}"
+            if kind[0] != "prim":
+                value = f"{_decode_expr(kind, f'd[{f.name!r}]')} if {f.name!r} in d else {default_name}"
+        else:
+            value = _decode_expr(kind, f"d[{f.name!r}]")
+        dec_args.append(f"{f.name}=({value})")
+
+    src = (
+        f"def encode_{name}(o):\n"
+        f"    return {{{', '.join(enc_items)}}}\n"
+        f"\n"
+        f"def decode_{name}(d):\n"
+        f"    return {name}({', '.join(dec_args)})\n"
+    )
+    exec(compile(src, f"<codec {name}>", "exec"), _NAMESPACE)
+    ENCODERS[cls] = _NAMESPACE[f"encode_{name}"]
+    DECODERS[cls] = _NAMESPACE[f"decode_{name}"]
+
+
+def encode(obj: Any) -> Any:
+    """Encode a model object (or list of them) into plain JSON-compatible data."""
+    encoder = ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    if isinstance(obj, LapView):
+        return ENCODERS[model_classes.Lap](obj)
+    if isinstance(obj, LapBlock):
+        return encode_lap_block(obj)
+    if isinstance(obj, (list, tuple)):
+        return [encode(v) for v in obj]
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        compile_codec(type(obj))
+        return ENCODERS[type(obj)](obj)
+    return obj
+
+
+def decode(cls: Type[T], data: Dict[str, Any]) -> T:
+    """Rebuild a model object, including its nested dataclasses, from plain data."""
+    decoder = DECODERS.get(cls)
+    if decoder is None:
+        compile_codec(cls)
+        decoder = DECODERS[cls]
+    return decoder(data)
+
+
+# a model_classes összes dataclass-a import időben
+for _cls in (model_classes.Player, model_classes.Race_Data, model_classes.Lap,
+             model_classes.ParticipantResult, model_classes.RaceResult):
+    compile_codec(_cls)
@@ -0,0 +1,75 @@
+#data/basic/coercion.py:
+
+import json
+import typing
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict
+
+# Szöveges forrásból (CSV, kézzel szerkesztett XLSX) érkező cellák típusra
+# hozása. Üres cella -> None; a már helyes típusú érték változatlan marad.
+
+
+def to_int(v: Any) -> Any:
+    if v is None or isinstance(v, int):
+        return v
+    if isinstance(v, float):
+        return int(v) if v.is_integer() else v
+    v = str(v).strip()
+    if not v:
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        return to_int(float(v))
+
+
+def to_float(v: Any) -> Any:
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return None
+    return float(v)
+
+
+def to_bool(v: Any) -> Any:
+    if v is None or isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return bool(v)
+    v = str(v).strip().lower()
+    if not v:
+        return None
+    return v in ("true", "1", "yes", "igen")
+
+
+def to_str(v: Any) -> Any:
+    return v if v is None or isinstance(v, str) else str(v)
+
+
+def from_json(v: Any) -> Any:
+    # beágyazott struktúra: mentéskor JSON stringgé lapítottuk (CSV, XLSX)
+    return json.loads(v) if isinstance(v, str) else v
+
+
+def coercer(tp: Any) -> Callable[[Any], Any]:
+    """Converter for one field type (Optional[X] -> X, nested -> JSON)."""
+    if typing.get_origin(tp) is typing.Union:
+        args = [a for a in typing.get_args(tp) if a is not type(None)]
+        if len(args) == 1:
+            return coercer(args[0])
+        return from_json
+    if tp is bool:
+        return to_bool
+    if tp is int:
+        return to_int
+    if tp is float:
+        return to_float
+    if tp is str:
+        return to_str
+    if is_dataclass(tp) or typing.get_origin(tp) in (list, dict, tuple):
+        return from_json
+    return lambda v: v
+
+
+def column_converters(cls: type) -> Dict[str, Callable[[Any], Any]]:
+    """Per-column converters derived from the field types of a dataclass."""
+    hints = typing.get_type_hints(cls)
+    return {f.name: coercer(hints[f.name]) for f in fields(cls)}
@@ -1,34 +1,171 @@
 #functions/csv_handler.py:
 
 import csv
+import json
 from pathlib import Path
-from dataclasses import asdict, is_dataclass
-from typing import List, Type, TypeVar
+from dataclasses import is_dataclass
+from data.basic.codec import encode, decode
+from data.basic.coercion import column_converters
+from data.basic.handler.export_pipeline import append_lock
+from data.basic.model_classes import RaceResult
+from data.basic.race_tables import RACE_CONVERTERS, PARTICIPANT_CONVERTERS, LAP_CONVERTERS, join_race_tables
+from typing import Any, Callable, Dict, Iterator, List, Type, TypeVar
 
 T = TypeVar("T")
 
-def save_csv(items: List, filename: str) -> None:
+# normalizált versenyeredmény táblák (race_id / user_id kulcsokkal)
+RACE_TABLES = ("races", "participants", "laps")
+
+
+def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    # beágyazott struktúrák JSON stringgé (visszatölthető, nem Python repr)
+    return {k: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+            for k, v in row.items()}
+
+
+def save_csv(items: List, filename: str) -> Path:
     path = Path("created/csvs/") / filename
     path.parent.mkdir(parents=True, exist_ok=True)
-    rows = [asdict(i) if is_dataclass(i) else i for i in items]
+    rows = [_flatten(encode(i)) if is_dataclass(i) else i for i in items]
     if not rows:
         with open(path, "w", newline="", encoding="utf-8") as f:
             pass
-        return
+        return path
     headers = list(rows[0].keys())
     with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=headers)
         w.writeheader()
         w.writerows(rows)
+    return path
+
+def _iter_typed(path: Path, converters: Dict[str, Callable[[Any], Any]]) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        r = csv.reader(f)
+        headers = next(r, None)
+        if headers is None:
+            return
+        convs = [converters.get(h) for h in headers]
+        for values in r:
+            if not values:
+                continue
+            yield {h: (c(v) if c is not None else v) for h, c, v in zip(headers, convs, values)}
 
 def load_csv(filename: str, cls: Type[T]) -> List[T]:
+    """
+    Load a CSV file into dataclass instances, coercing every column to the
+    type of its dataclass field (nested values are read back from JSON).
+
+    Args:
+        filename (str): Path under created/csvs/.
+        cls (Type[T]): Target dataclass.
+
+    Returns:
+        List[T]: The loaded objects.
+    """
     path = Path("created/csvs/") / filename
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        items = []
-        for row in r:
-            for k, v in row.items():
-                if v.isdigit():
-                    row[k] = int(v)
-            items.append(cls(**row))
-    return items
\ No newline at end of file
+    return [decode(cls, row) for row in _iter_typed(path, column_converters(cls))]
+
+
+# --- normalizált versenyeredmény táblák ---
+
+def race_tables(rr: RaceResult) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split a `RaceResult` into rows of the races / participants / laps tables.
+
+    Values stay raw (times in ms, timestamp in epoch ms), so the tables load
+    back without parsing formatted strings.
+    """
+    races = [{
+        "race_id": rr.race_id,
+        "track": rr.track,
+        "layout": rr.layout,
+        "car_class": rr.car_class,
+        "timestamp": rr.timestamp
+    }]
+    participants = []
+    laps = []
+    for p in rr.participants:
+        participants.append({
+            "race_id": rr.race_id,
+            "user_id": p.user_id,
+            "username": p.username,
+            "start_position": p.start_position,
+            "finish_position": p.finish_position,
+            "incident_points": p.incident_points,
+            "total_time": p.total_time,
+            "rating_before": p.results["rating_before"],
+            "reputation_before": p.results["reputation_before"],
+            "rating_change": p.results["rating_change"],
+            "reputation_change": p.results["reputation_change"],
+            "new_rating": p.new_rating,
+            "new_rep": p.new_rep
+        })
+        for l in p.laps:
+            laps.append({
+                "race_id": rr.race_id,
+                "user_id": p.user_id,
+                "lap": l.lap,
+                "time": l.time,
+                "valid": l.valid,
+                "position": l.position,
+                "incidents": ", ".join(l.incidents)
+            })
+    return {"races": races, "participants": participants, "laps": laps}
+
+
+def append_race_tables(results: List[RaceResult], directory: str = "race_results") -> List[Path]:
+    """
+    Append race results to the normalized races.csv, participants.csv and
+    laps.csv tables (the header is written when a table is created).
+
+    Args:
+        results (List[RaceResult]): Races to append.
+        directory (str): Table directory, relative to created/csvs/.
+
+    Returns:
+        List[Path]: The table files.
+    """
+    base = Path("created/csvs/") / directory
+    base.mkdir(parents=True, exist_ok=True)
+
+    rows: Dict[str, List[Dict[str, Any]]] = {name: [] for name in RACE_TABLES}
+    for rr in results:
+        for name, table_rows in race_tables(rr).items():
+            rows[name].extend(table_rows)
+
+    paths = []
+    with append_lock(base):
+        for name in RACE_TABLES:
+            path = base / f"{name}.csv"
+            paths.append(path)
+            if not rows[name]:
+                continue
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=list(rows[name][0].keys()))
+                if f.tell() == 0:
+                    w.writeheader()
+                w.writerows(rows[name])
+    return paths
+
+
+def load_race_tables(directory: str = "race_results") -> List[RaceResult]:
+    """
+    Rebuild `RaceResult` objects from the normalized tables in one linear pass
+    per table (hash join on race_id / user_id).
+
+    Args:
+        directory (str): Table directory, relative to created/csvs/.
+
+    Returns:
+        List[RaceResult]: Races in table order, participants and laps attached.
+
+    Raises:
+        ValueError: A participants / laps row has no parent row (truncated or
+            edited tables); the message names the table, row and key.
+    """
+    base = Path("created/csvs/") / directory
+    return join_race_tables(
+        _iter_typed(base / "races.csv", RACE_CONVERTERS),
+        _iter_typed(base / "participants.csv", PARTICIPANT_CONVERTERS),
+        _iter_typed(base / "laps.csv", LAP_CONVERTERS)
+    )
@@ -0,0 +1,149 @@
+#data/basic/handler/export_pipeline.py:
+
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union
+
+# writer: egy elemet ment, és visszaadja a megírt fájl(ok) útvonalát (vagy None-t)
+Writer = Callable[[Any], Union[None, Path, Iterable[Path]]]
+
+_STOP = object()
+
+# hozzáfűzős fájlok (JSON Lines log, CSV táblák) zárja, útvonalanként egy
+_append_locks: Dict[Path, threading.Lock] = {}
+_append_locks_guard = threading.Lock()
+
+
+def fsync_path(path: Path) -> None:
+    """Flush a written file to the disk (the OS page cache alone is not durable)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def append_lock(path: Path) -> threading.Lock:
+    """The lock serializing appends to `path` across writer threads."""
+    with _append_locks_guard:
+        return _append_locks.setdefault(Path(path).resolve(), threading.Lock())
+
+
+class ExportError(RuntimeError):
+    """An export writer failed; raised back in the producer thread."""
+
+
+class ExportPipeline:
+    """
+    Background export stage between the simulation and the file writers.
+
+    Every format has its own bounded queue and writer thread pool. `submit`
+    blocks while a queue is full (backpressure), so the producer never runs
+    far ahead of the disk. The first writer error is re-raised as
+    `ExportError` on the next `submit`/`flush`. `flush` is a barrier: it waits
+    until every queued item is written and fsyncs the written files.
+
+    Usage:
+        with ExportPipeline({"json": write_json, "csv": write_csv}) as exports:
+            for item in produce():
+                exports.submit(item)
+        # itt minden fájl lemezen van
+    """
+
+    def __init__(
+        self,
+        writers: Dict[str, Writer],
+        queue_size: int = 64,
+        workers: Union[int, Dict[str, int]] = 1,
+        fsync: bool = True
+    ):
+        self._writers = writers
+        self._fsync = fsync
+        self._queues: Dict[str, queue.Queue] = {name: queue.Queue(maxsize=queue_size) for name in writers}
+        self._threads: Dict[str, List[threading.Thread]] = {name: [] for name in writers}
+        self._written: Set[Path] = set()
+        self._lock = threading.Lock()
+        self._error: Optional[ExportError] = None
+
+        for name in writers:
+            n = workers.get(name, 1) if isinstance(workers, dict) else workers
+            for i in range(max(1, n)):
+                t = threading.Thread(target=self._work, args=(name,), name=f"export-{name}-{i}", daemon=True)
+                t.start()
+                self._threads[name].append(t)
+
+    def _work(self, name: str) -> None:
+        q = self._queues[name]
+        writer = self._writers[name]
+        while True:
+            item = q.get()
+            try:
+                if item is _STOP:
+                    return
+                if self._error is not None:
+                    continue  # hiba után már csak ürítjük a sort
+                written = writer(item)
+                if written is not None:
+                    paths = [written] if isinstance(written, (str, Path)) else written
+                    with self._lock:
+                        self._written.update(Path(p) for p in paths)
+            except Exception as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = ExportError(f"{name} export failed: {e}")
+                        self._error.__cause__ = e
+            finally:
+                q.task_done()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, item: Any) -> None:
+        """Queue an item for every format (blocks while a queue is full)."""
+        self._raise_if_failed()
+        for q in self._queues.values():
+            q.put(item)
+
+    def flush(self) -> None:
+        """Wait until every queued item is written, then fsync the written files."""
+        for q in self._queues.values():
+            q.join()
+        self._raise_if_failed()
+
+        with self._lock:
+            written, self._written = self._written, set()
+        if self._fsync:
+            for path in written:
+                fsync_path(path)
+
+    def close(self) -> None:
+        """Flush, then stop the writer threads."""
+        try:
+            self.flush()
+        finally:
+            self._stop()
+
+    def _stop(self) -> None:
+        for name, threads in self._threads.items():
+            for _ in threads:
+                self._queues[name].put(_STOP)
+        for threads in self._threads.values():
+            for t in threads:
+                t.join()
+            threads.clear()
+
+    def __enter__(self) -> "ExportPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # a termelő hibáját nem takarjuk el az export hibájával
+            try:
+                self._stop()
+            except Exception:
+                pass
@@ -3,12 +3,30 @@
 import json
 from pathlib import Path
 from data.basic.model_classes import *
-from dataclasses import asdict, is_dataclass
-from typing import List, Any, Type, TypeVar
+from data.basic.codec import encode, decode
+from data.basic.handler.export_pipeline import append_lock
+from dataclasses import is_dataclass
+from typing import List, Any, Type, TypeVar, Dict, Tuple, Iterator, Optional
 
 T = TypeVar("T")
 
-def save_json(items: List[Any], filename: str) -> None:
+# a json fájlok alapértelmezett helye (a JSON Lines függvényeknél `base`-szel felülírható)
+JSON_DIR = Path("created/jsons")
+
+# JSON Lines log: egy rekord soronként, mellette <log>.idx: key \t offset \t length
+INDEX_SUFFIX = ".idx"
+
+
+def _serialize(item: Any) -> Any:
+    if is_dataclass(item):
+        return encode(item)
+    elif isinstance(item, (dict, list, str, int, float, bool, type(None))):
+        return item
+    else:
+        # Fallback: try to convert to string
+        return str(item)
+
+def save_json(items: List[Any], filename: str) -> Path:
     """
     Save any list of objects into a JSON file.
     Handles dataclasses, dicts, and primitive types.
@@ -16,23 +34,21 @@ def save_json(items: List[Any], filename: str) -> None:
     Args:
         items (List[Any]): List of objects (dataclass, dict, str, int, etc.)
         filename (str): Path to the JSON file to save.
+
+    Returns:
+        Path: The written file.
     """
-    serialized = []
-    for item in items:
-        if is_dataclass(item):
-            serialized.append(asdict(item))
-        elif isinstance(item, (dict, list, str, int, float, bool, type(None))):
-            serialized.append(item)
-        else:
-            # Fallback: try to convert to string
-            serialized.append(str(item))
+    serialized = [_serialize(item) for item in items]
 
-    with open(f"created/jsons/{filename}", "w", encoding="utf-8") as f:
+    path = JSON_DIR / filename
+    with open(path, "w", encoding="utf-8") as f:
         json.dump(serialized, f, indent=4, ensure_ascii=False)
+    return path
 
 def load_from_json(filename: str, cls: Type[T]) -> List[T]:
     """
-    Load a list of objects from a JSON file and convert them into dataclass instances.
+    Load a list of objects from a JSON file and convert them into dataclass instances
+    (nested dataclasses included).
 
     Args:
         filename (str): Path to the JSON file to load (relative to 'created/' mappa).
@@ -41,14 +57,144 @@ def load_from_json(filename: str, cls: Type[T]) -> List[T]:
     Returns:
         List[T]: A list of dataclass instances.
     """
-    path = Path("created/jsons/") / filename
+    path = JSON_DIR / filename
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
     result: List[T] = []
     for item in data:
         if is_dataclass(cls):
-            result.append(cls(**item))
+            # a beágyazott ParticipantResult/Lap objektumokat is visszaépíti
+            result.append(decode(cls, item))
         else:
             result.append(item)
-    return result
\ No newline at end of file
+    return result
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def append_jsonl(items: List[Any], filename: str, key: str = "race_id", base: Path = JSON_DIR) -> Path:
+    """
+    Append objects to a JSON Lines log and record their byte ranges in the
+    sidecar index (<filename>.idx, one "key\toffset\tlength" line per record).
+
+    Args:
+        items (List[Any]): Objects to append (dataclass, dict, ...).
+        filename (str): Log file, relative to `base`.
+        key (str): Field used as the index key (e.g. race_id).
+        base (Path): Directory of the log (default: created/jsons/).
+
+    Returns:
+        Path: The log file.
+    """
+    path = Path(base) / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    records = []
+    for item in items:
+        data = _serialize(item)
+        line = json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+        records.append((str(data[key]), line.encode("utf-8")))
+
+    with append_lock(path):
+        with open(path, "ab") as log, open(_index_path(path), "a", encoding="utf-8") as idx:
+            offset = log.seek(0, 2)
+            for record_key, payload in records:
+                log.write(payload)
+                idx.write(f"{record_key}\t{offset}\t{len(payload)}\n")
+                offset += len(payload)
+    return path
+
+
+def load_jsonl_index(filename: str, base: Path = JSON_DIR) -> Dict[str, Tuple[int, int]]:
+    """
+    Load the sidecar index of a JSON Lines log (`filename` relative to `base`).
+
+    Returns:
+        Dict[str, Tuple[int, int]]: key -> (offset, length); empty if there is no index.
+    """
+    idx_path = _index_path(Path(base) / filename)
+    index: Dict[str, Tuple[int, int]] = {}
+    if not idx_path.exists():
+        return index
+    with open(idx_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record_key, offset, length = line.rstrip("\n").split("\t")
+            index[record_key] = (int(offset), int(length))
+    return index
+
+
+def read_jsonl_record(
+    filename: str,
+    key: str,
+    index: Optional[Dict[str, Tuple[int, int]]] = None,
+    base: Path = JSON_DIR
+) -> Optional[Any]:
+    """
+    Read a single record of a JSON Lines log with one seek + read.
+
+    Args:
+        filename (str): Log file, relative to `base`.
+        key (str): Record key (e.g. race_id).
+        index (Dict, optional): Already loaded index; loaded from disk when omitted.
+        base (Path): Directory of the log (default: created/jsons/).
+
+    Returns:
+        Optional[Any]: The decoded record, or None if the key is not in the index.
+    """
+    index = index if index is not None else load_jsonl_index(filename, base)
+    if key not in index:
+        return None
+    offset, length = index[key]
+    with open(Path(base) / filename, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+def iter_jsonl(filename: str, start: int = 0, base: Path = JSON_DIR) -> Iterator[Any]:
+    """
+    Iterate over every record of a JSON Lines log in one sequential read.
+
+    Args:
+        filename (str): Log file, relative to `base`.
+        start (int): Byte offset to start from (0 = beginning).
+        base (Path): Directory of the log (default: created/jsons/).
+
+    Yields:
+        Any: The decoded records, in append order.
+    """
+    with open(Path(base) / filename, "rb") as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # félbe írt utolsó sor (az író még nem végzett vele)
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_jsonl_tail(filename: str, start: int = 0, base: Path = JSON_DIR) -> Tuple[List[Any], int]:
+    """
+    Read the records appended to a JSON Lines log since `start`.
+
+    Args:
+        filename (str): Log file, relative to `base`.
+        start (int): Byte offset where the previous read stopped.
+        base (Path): Directory of the log (default: created/jsons/).
+
+    Returns:
+        Tuple[List[Any], int]: The new records and the offset to continue from
+        (a half-written last line is left for the next read).
+    """
+    records = []
+    offset = start
+    with open(Path(base) / filename, "rb") as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                records.append(json.loads(line))
+            offset += len(line)
+    return records, offset
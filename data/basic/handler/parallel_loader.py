@@ -0,0 +1,172 @@
+#functions/parallel_loader.py:
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from data.basic.handler.sql_handler import (
+    SQLHandler, LoadStats, player_rows, race_rows, participant_rows, lap_rows
+)
+from data.basic.model_classes import Player, Race_Data, RaceResult
+
+
+def partition_by_race_id(race_results: Iterable[RaceResult], partitions: int) -> List[List[RaceResult]]:
+    """
+    Split results into `partitions` contiguous race_id ranges of about equal size.
+
+    Returns:
+        List[List[RaceResult]]: Non-empty partitions in race_id order.
+    """
+    ordered = sorted(race_results, key=lambda rr: rr.race_id)
+    if not ordered:
+        return []
+    partitions = max(1, min(partitions, len(ordered)))
+    size, extra = divmod(len(ordered), partitions)
+    parts, start = [], 0
+    for i in range(partitions):
+        end = start + size + (1 if i < extra else 0)
+        parts.append(ordered[start:end])
+        start = end
+    return parts
+
+
+class ParallelLoader:
+    """
+    Loads a season over a pool of DB sessions.
+
+    Phase 1 loads the FK-independent parent tables (players, races) in
+    parallel, each on its own session. Once both are committed, phase 2 loads
+    the child tables (participants, laps) in race_id range partitions, every
+    partition on its own session, so the wall-clock time scales with the
+    available sessions while the FK order is kept. An incremental load only
+    sends the races whose race_id is not stored yet. Sessions commit on their
+    own, so if any phase fails the committed rows are undone: an incremental
+    load deletes its new races again (the next run loads them in full), a full
+    load leaves empty tables instead of a half-loaded season.
+
+    Usage:
+        pool = create_pool(8)
+        loader = ParallelLoader(lambda: SQLHandler(pool=pool, commit_every=10), sessions=8)
+        stats = loader.load(players, races, race_results)
+    """
+
+    def __init__(
+        self,
+        make_handler: Callable[[], SQLHandler],
+        sessions: int = 4,
+        partitions: Optional[int] = None
+    ):
+        """
+        Args:
+            make_handler (Callable[[], SQLHandler]): Builds an unconnected handler
+                on the shared pool (batch size and commit boundary come from it).
+            sessions (int): Number of parallel sessions (worker threads).
+            partitions (int, optional): race_id partitions per child table (default: sessions).
+        """
+        self.make_handler = make_handler
+        self.sessions = max(1, sessions)
+        self.partitions = partitions or self.sessions
+
+    def _run(self, load: Callable[[SQLHandler], LoadStats]) -> LoadStats:
+        # egy feladat = egy session, a végén commit (a köztes határokat a handler adja)
+        handler = self.make_handler()
+        handler.connect()
+        try:
+            stats = load(handler)
+            handler.commit()
+            return stats
+        finally:
+            handler.close()
+
+    def _run_all(self, pool: ThreadPoolExecutor, tasks: Sequence[Callable[[SQLHandler], LoadStats]]) -> List[LoadStats]:
+        futures = [pool.submit(self._run, task) for task in tasks]
+        # hiba esetén is megvárjuk a többi session-t, mielőtt bármit visszacsinálunk
+        wait(futures)
+        return [f.result() for f in futures]
+
+    def _session(self, task: Callable[[SQLHandler], Any]) -> Any:
+        # egyszeri feladat a szálkészleten kívül, saját session-ön
+        handler = self.make_handler()
+        handler.connect()
+        try:
+            return task(handler)
+        finally:
+            handler.close()
+
+    def _undo(self, race_ids: Sequence[str]) -> None:
+        self._session(lambda h: h.delete_races(race_ids))
+
+    def prepare(self, clear: bool = False) -> None:
+        """Create (or drop and recreate) the schema on one session."""
+        def run(handler: SQLHandler) -> None:
+            if clear:
+                handler.clear_tables()
+            handler.create_schema()
+        self._session(run)
+
+    def load(
+        self,
+        players: Iterable[Player],
+        races: Iterable[Race_Data],
+        race_results: Iterable[RaceResult],
+        incremental: bool = False
+    ) -> List[LoadStats]:
+        """
+        Load players, races, participants and laps (schema must exist, see `prepare`).
+
+        A full (non-incremental) load expects freshly cleared tables
+        (`prepare(clear=True)`) and clears them again if it fails.
+
+        Args:
+            players (Iterable[Player]): Players (MERGE-upserted when incremental).
+            races (Iterable[Race_Data]): Race metadata.
+            race_results (Iterable[RaceResult]): Results.
+            incremental (bool): Only races whose race_id is not stored yet.
+
+        Returns:
+            List[LoadStats]: Merged stats of the players, races, participants and
+            laps loads; the races stats count the already stored races as `skipped`.
+        """
+        skipped = 0
+        if incremental:
+            self.prepare()
+            races, race_results, skipped = self._session(lambda h: h.new_races(races, race_results))
+        players, races = list(players), list(races)
+        parts = partition_by_race_id(race_results, self.partitions)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix="db-load") as pool:
+                # 1. fázis: szülő táblák, egymástól függetlenül
+                load_players = (lambda h: h.bulk_upsert("players", player_rows(players))) if incremental \
+                    else (lambda h: h.bulk_insert("players", player_rows(players)))
+                player_stats, race_stats = self._run_all(pool, [
+                    load_players,
+                    lambda h: h.bulk_insert("races", race_rows(races))
+                ])
+                race_stats.skipped = skipped
+
+                # 2. fázis: gyerek táblák race_id tartományonként
+                tasks = []
+                for part in parts:
+                    tasks.append(lambda h, part=part: h.bulk_insert(
+                        "participants", (row for rr in part for row in participant_rows(rr))))
+                    tasks.append(lambda h, part=part: h.bulk_insert(
+                        "laps", (row for rr in part for row in lap_rows(rr))))
+                child_stats = self._run_all(pool, tasks)
+        except Exception:
+            # a session-ök külön commitolnak: a már beírt sorokat vissza kell vonni
+            if incremental:
+                # különben a következő futás átugraná ezeket a versenyeket
+                self._undo([r.RACE_ID for r in races])
+            else:
+                self.prepare(clear=True)
+            raise
+
+        by_table: Dict[str, List[LoadStats]] = {"participants": [], "laps": []}
+        for stats in child_stats:
+            by_table[stats.table].append(stats)
+        return [
+            player_stats,
+            race_stats,
+            LoadStats.merge("participants", by_table["participants"]),
+            LoadStats.merge("laps", by_table["laps"])
+        ]
@@ -1,11 +1,17 @@
 #functions/sql_handler.py:
 
 import os
-import oracledb
+import time
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 from data.basic.model_classes import Player, Race_Data, RaceResult
 
+try:
+    import oracledb
+except ImportError:  # helyi (SQLite) futtatáshoz nem kell
+    oracledb = None
+
 # --- .env betöltése ---
 load_dotenv()
 DB_USER = os.getenv("DB_USER")
@@ -14,13 +20,209 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = int(os.getenv("DB_PORT", "1521"))
 DB_SERVICE = os.getenv("DB_SERVICE")
 
+# ennyi soronként megy egy executemany a szerverre
+BATCH_SIZE = 5000
+# race_id lista mérete egy IN (...) feltételben (Oracle: max 1000, régi SQLite: max 999 paraméter)
+IN_LIST_SIZE = 500
+
+# táblák elsődleges kulcsa (upsert / MERGE feltétel)
+TABLE_KEYS = {
+    "players": ("user_id",),
+    "races": ("race_id",),
+    "participants": ("race_id", "user_id"),
+    "laps": ("race_id", "user_id", "lap")
+}
+
+# oszlopok és bind típusok: NUM = szám, egész = VARCHAR2/CHAR max. hossza
+NUM = "number"
+TABLE_COLUMNS = {
+    "players": (
+        ("user_id", NUM), ("username", 100), ("full_name", 200), ("nationality", 100),
+        ("team", 200), ("elo_rating", NUM), ("reputation", NUM), ("race_count", NUM)
+    ),
+    "races": (
+        ("race_id", 20), ("track", 200), ("layout", 200), ("car_class", 100), ("timestamp", NUM)
+    ),
+    "participants": (
+        ("race_id", 20), ("user_id", NUM), ("start_position", NUM), ("finish_position", NUM),
+        ("incident_points", NUM), ("total_time", NUM),
+        ("rating_before", NUM), ("rating_change", NUM),
+        ("reputation_before", NUM), ("reputation_change", NUM),
+        ("new_rating", NUM), ("new_rep", NUM)
+    ),
+    "laps": (
+        ("race_id", 20), ("user_id", NUM), ("lap", NUM), ("time", NUM),
+        ("position", NUM), ("valid", 1), ("incidents", 500)
+    )
+}
+
+
+# a gyakori lekérdezésekhez (játékos szerinti szűrés, résztvevő -> körök join)
+INDEXES_SQL = (
+    "CREATE INDEX participants_user_idx ON participants (user_id)",
+    "CREATE INDEX laps_race_user_idx ON laps (race_id, user_id)"
+)
+# régebbi sémák indexei, amelyeket már semmi sem használ (create_schema eldobja őket);
+# a races.timestamp szerinti szűrést a race_id anti-join váltotta
+OBSOLETE_INDEXES = ("races_timestamp_idx",)
+
+
+@dataclass
+class LoadStats:
+    """Row counts, batch timings and rejected rows of one table load."""
+    table: str
+    rows: int = 0
+    batches: int = 0
+    batch_seconds: List[float] = field(default_factory=list)
+    # (sor sorszáma a betöltésen belül, hibaüzenet)
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    # inkrementális betöltésnél: már az adatbázisban lévő, ki nem küldött sorok
+    skipped: int = 0
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.batch_seconds)
+
+    @property
+    def loaded(self) -> int:
+        return self.rows - len(self.errors)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @classmethod
+    def merge(cls, table: str, parts: Iterable["LoadStats"]) -> "LoadStats":
+        """Combine the stats of partitions loaded separately (offsets follow partition order)."""
+        total = cls(table)
+        for part in parts:
+            total.errors.extend((total.rows + offset, msg) for offset, msg in part.errors)
+            total.rows += part.rows
+            total.skipped += part.skipped
+            total.batches += part.batches
+            total.batch_seconds.extend(part.batch_seconds)
+        return total
+
+    def __str__(self) -> str:
+        skipped = f", {self.skipped} már betöltve" if self.skipped else ""
+        return (f"{self.table}: {self.loaded}/{self.rows} sor, {self.batches} batch, "
+                f"{self.seconds:.3f} s ({self.rows_per_sec:,.0f} sor/s), {len(self.errors)} hiba{skipped}")
+
+
+# --- sor generátorok (a betöltés ezekből streamel) ---
+
+def player_rows(players: Iterable[Player]) -> Iterator[tuple]:
+    for p in players:
+        yield (p.USER_ID, p.username, p.full_name, p.nationality, p.team, p.elo_rating, p.reputation, p.race_count)
+
+
+def race_rows(races: Iterable[Race_Data]) -> Iterator[tuple]:
+    for r in races:
+        yield (r.RACE_ID, r.track, r.layout, r.car_class, r.timestamp)
+
+
+def participant_rows(result: RaceResult) -> Iterator[tuple]:
+    for p in result.participants:
+        yield (
+            result.race_id, p.user_id, p.start_position, p.finish_position,
+            p.incident_points, p.total_time,
+            p.results["rating_before"], p.results["rating_change"],
+            p.results["reputation_before"], p.results["reputation_change"],
+            p.new_rating, p.new_rep
+        )
+
+
+def lap_rows(result: RaceResult) -> Iterator[tuple]:
+    for p in result.participants:
+        for l in p.laps:
+            yield (
+                result.race_id, p.user_id, l.lap, l.time,
+                l.position, "Y" if l.valid else "N",
+                ", ".join(l.incidents) if l.incidents else ""
+            )
+
+
+class _BatchBuffer:
+    """Collects the rows of one table and sends them in fixed-size batches."""
+
+    def __init__(self, handler: "SQLHandler", table: str, batch_size: int, sql: Optional[str] = None):
+        self.handler = handler
+        self.table = table
+        self.batch_size = batch_size
+        self.sql = sql or handler.insert_sql(table)
+        self.rows: List[tuple] = []
+        self.stats = LoadStats(table)
+
+    def add(self, row: tuple) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[tuple]) -> None:
+        for row in rows:
+            self.add(row)
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        batch, self.rows = self.rows, []
+        start = time.perf_counter()
+        errors = self.handler.execute_batch(self.table, self.sql, batch)
+        self.stats.batch_seconds.append(time.perf_counter() - start)
+        self.stats.errors.extend((self.stats.rows + offset, msg) for offset, msg in errors)
+        self.stats.rows += len(batch)
+        self.stats.batches += 1
+        # commit határ: minden commit_every-edik batch után
+        if self.handler.commit_every and self.stats.batches % self.handler.commit_every == 0:
+            self.handler.commit()
+
+
+def create_pool(sessions: int):
+    """
+    Oracle session pool with a fixed number of sessions (.env connection data).
+
+    Args:
+        sessions (int): Number of pooled sessions.
+
+    Returns:
+        oracledb.ConnectionPool: Pass it as `pool` to `SQLHandler`.
+    """
+    if oracledb is None:
+        raise RuntimeError("Oracle betöltéshez telepítsd az oracledb csomagot (pip install oracledb)")
+    return oracledb.create_pool(
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT,
+        service_name=DB_SERVICE,
+        min=sessions,
+        max=sessions,
+        increment=0,
+        getmode=oracledb.POOL_GETMODE_WAIT
+    )
+
 
 class SQLHandler:
-    def __init__(self):
+    def __init__(self, batch_size: int = BATCH_SIZE, pool=None, commit_every: Optional[int] = None):
+        """
+        Args:
+            batch_size (int): Rows per executemany.
+            pool: Session pool to take the connection from (None = own connection).
+            commit_every (int, optional): Commit after every N batches (None = caller commits).
+        """
         self.conn = None
         self.cur = None
+        self.batch_size = batch_size
+        self.pool = pool
+        self.commit_every = commit_every
 
     def connect(self):
+        if self.pool is not None:
+            self.conn = self.pool.acquire()
+            self.cur = self.conn.cursor()
+            return
+        if oracledb is None:
+            raise RuntimeError("Oracle betöltéshez telepítsd az oracledb csomagot (pip install oracledb)")
         self.conn = oracledb.connect(
             user=DB_USER,
             password=DB_PASSWORD,
@@ -34,7 +236,11 @@ class SQLHandler:
         if self.cur:
             self.cur.close()
         if self.conn:
-            self.conn.close()
+            if self.pool is not None:
+                self.pool.release(self.conn)  # vissza a poolba
+            else:
+                self.conn.close()
+        self.conn = self.cur = None
 
     def clear_tables(self):
         for table in ["laps", "participants", "races", "players"]:
@@ -66,7 +272,8 @@ class SQLHandler:
                     race_id VARCHAR2(20) PRIMARY KEY,
                     track VARCHAR2(200),
                     layout VARCHAR2(200),
-                    car_class VARCHAR2(100)
+                    car_class VARCHAR2(100),
+                    timestamp NUMBER
                 )
             """,
             "participants": """
@@ -109,56 +316,187 @@ class SQLHandler:
                 else:
                     raise
 
+        # régebbi séma: races.timestamp hiányzik (ORA-01430: már létezik)
+        try:
+            self.cur.execute("ALTER TABLE races ADD (timestamp NUMBER)")
+        except oracledb.DatabaseError as e:
+            if "ORA-01430" not in str(e):
+                raise
+
+        for sql in INDEXES_SQL:
+            try:
+                self.cur.execute(sql)
+            except oracledb.DatabaseError as e:
+                # ORA-00955: name already used, ORA-01408: already indexed
+                if "ORA-00955" in str(e) or "ORA-01408" in str(e):
+                    pass
+                else:
+                    raise
+
+        for name in OBSOLETE_INDEXES:
+            try:
+                self.cur.execute(f"DROP INDEX {name}")
+            except oracledb.DatabaseError as e:
+                if "ORA-01418" not in str(e):  # specified index does not exist
+                    raise
+
         self.conn.commit()
 
-    def insert_players(self, players: List[Player]):
-        self.cur.executemany("""
-            INSERT INTO players (user_id, username, full_name, nationality, team, elo_rating, reputation, race_count)
-            VALUES (:1,:2,:3,:4,:5,:6,:7,:8)
-        """, [(p.USER_ID, p.username, p.full_name, p.nationality, p.team, p.elo_rating, p.reputation, p.race_count) for p in players])
-
-    def insert_races(self, races: List[Race_Data]):
-        self.cur.executemany("""
-            INSERT INTO races (race_id, track, layout, car_class)
-            VALUES (:1,:2,:3,:4)
-        """, [(r.RACE_ID, r.track, r.layout, r.car_class) for r in races])
-
-    def insert_results(self, race_results: List[RaceResult]):
-        participants_rows = []
-        laps_rows = []
+    # --- bulk betöltés ---
+
+    def placeholder(self, i: int) -> str:
+        return f":{i}"
+
+    def insert_sql(self, table: str) -> str:
+        columns = [name for name, _ in TABLE_COLUMNS[table]]
+        values = ",".join(self.placeholder(i) for i in range(1, len(columns) + 1))
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({values})"
+
+    def upsert_sql(self, table: str) -> str:
+        """MERGE statement that inserts new rows and updates only changed ones."""
+        columns = [name for name, _ in TABLE_COLUMNS[table]]
+        keys = TABLE_KEYS[table]
+        others = [c for c in columns if c not in keys]
+        source = ", ".join(f"{self.placeholder(i)} {c}" for i, c in enumerate(columns, start=1))
+        on = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+        update = ", ".join(f"t.{c} = s.{c}" for c in others)
+        changed = " OR ".join(f"DECODE(t.{c}, s.{c}, 0, 1) = 1" for c in others)
+        return (
+            f"MERGE INTO {table} t USING (SELECT {source} FROM dual) s ON ({on}) "
+            f"WHEN MATCHED THEN UPDATE SET {update} WHERE {changed} "
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) "
+            f"VALUES ({', '.join('s.' + c for c in columns)})"
+        )
+
+    def execute_batch(self, table: str, sql: str, rows: Sequence[tuple]) -> List[Tuple[int, str]]:
+        """
+        Send one batch with pre-declared bind types; rows rejected by the
+        server are collected (batcherrors) instead of aborting the batch.
+
+        Returns:
+            List[Tuple[int, str]]: (offset within the batch, error message).
+        """
+        sizes = [oracledb.DB_TYPE_NUMBER if spec == NUM else spec for _, spec in TABLE_COLUMNS[table]]
+        self.cur.setinputsizes(*sizes)
+        self.cur.executemany(sql, rows, batcherrors=True)
+        return [(e.offset, e.message) for e in self.cur.getbatcherrors()]
+
+    def bulk_insert(self, table: str, rows: Iterable[tuple], batch_size: Optional[int] = None) -> LoadStats:
+        """
+        Stream rows into a table in batches of `batch_size`.
+
+        Args:
+            table (str): Target table (a key of TABLE_COLUMNS).
+            rows (Iterable[tuple]): Rows in TABLE_COLUMNS order; may be a generator.
+            batch_size (int, optional): Rows per executemany (default: handler setting).
+
+        Returns:
+            LoadStats: Row count, per-batch timings and rejected rows.
+        """
+        buffer = _BatchBuffer(self, table, batch_size or self.batch_size)
+        buffer.extend(rows)
+        buffer.flush()
+        return buffer.stats
+
+    def insert_players(self, players: Iterable[Player]) -> LoadStats:
+        return self.bulk_insert("players", player_rows(players))
+
+    def insert_races(self, races: Iterable[Race_Data]) -> LoadStats:
+        return self.bulk_insert("races", race_rows(races))
+
+    def insert_results(self, race_results: Iterable[RaceResult]) -> List[LoadStats]:
+        """
+        Load participants and laps in one pass over the results, so a
+        generator of results is streamed without materializing the season.
+
+        Returns:
+            List[LoadStats]: Stats of the participants and laps loads.
+        """
+        participants = _BatchBuffer(self, "participants", self.batch_size)
+        laps = _BatchBuffer(self, "laps", self.batch_size)
         for result in race_results:
-            for p in result.participants:
-                participants_rows.append((
-                    result.race_id, p.user_id, p.start_position, p.finish_position,
-                    p.incident_points, p.total_time,
-                    p.results["rating_before"], p.results["rating_change"],
-                    p.results["reputation_before"], p.results["reputation_change"],
-                    p.new_rating, p.new_rep
-                ))
-                for l in p.laps:
-                    laps_rows.append((
-                        result.race_id, p.user_id, l.lap, l.time,
-                        l.position, "Y" if l.valid else "N",
-                        ", ".join(l.incidents) if l.incidents else ""
-                    ))
-
-        if participants_rows:
-            self.cur.executemany("""
-                INSERT INTO participants (
-                    race_id, user_id, start_position, finish_position,
-                    incident_points, total_time,
-                    rating_before, rating_change,
-                    reputation_before, reputation_change,
-                    new_rating, new_rep
-                ) VALUES (:1,:2,:3,:4,:5,:6,:7,:8,:9,:10,:11,:12)
-            """, participants_rows)
-
-        if laps_rows:
-            self.cur.executemany("""
-                INSERT INTO laps (
-                    race_id, user_id, lap, time, position, valid, incidents
-                ) VALUES (:1,:2,:3,:4,:5,:6,:7)
-            """, laps_rows)
+            participants.extend(participant_rows(result))
+            laps.extend(lap_rows(result))
+        participants.flush()
+        laps.flush()
+        return [participants.stats, laps.stats]
+
+    def bulk_upsert(self, table: str, rows: Iterable[tuple], batch_size: Optional[int] = None) -> LoadStats:
+        """Like `bulk_insert`, but existing keys are updated (only if a value changed)."""
+        buffer = _BatchBuffer(self, table, batch_size or self.batch_size, sql=self.upsert_sql(table))
+        buffer.extend(rows)
+        buffer.flush()
+        return buffer.stats
+
+    def _in_list(self, n: int) -> str:
+        return ", ".join(self.placeholder(i + 1) for i in range(n))
+
+    def stored_race_ids(self, race_ids: Iterable[str]) -> Set[str]:
+        """The given race_ids that are already in the races table (queried in IN_LIST_SIZE chunks)."""
+        race_ids = list(race_ids)
+        stored: Set[str] = set()
+        for start in range(0, len(race_ids), IN_LIST_SIZE):
+            chunk = race_ids[start:start + IN_LIST_SIZE]
+            self.cur.execute(f"SELECT race_id FROM races WHERE race_id IN ({self._in_list(len(chunk))})", chunk)
+            stored.update(row[0] for row in self.cur.fetchall())
+        return stored
+
+    def new_races(
+        self,
+        races: Iterable[Race_Data],
+        race_results: Iterable[RaceResult]
+    ) -> Tuple[List[Race_Data], List[RaceResult], int]:
+        """
+        Anti-join of the races against the races table on race_id.
+
+        Returns:
+            Tuple[List[Race_Data], List[RaceResult], int]: The races and results
+            not stored yet, and the number of races skipped as already stored.
+        """
+        races = list(races)
+        stored = self.stored_race_ids(r.RACE_ID for r in races)
+        new = [r for r in races if r.RACE_ID not in stored]
+        new_ids = {r.RACE_ID for r in new}
+        return new, [rr for rr in race_results if rr.race_id in new_ids], len(races) - len(new)
+
+    def delete_races(self, race_ids: Iterable[str]) -> None:
+        """Remove these races with their participants and laps (undo of a failed load)."""
+        race_ids = list(race_ids)
+        for start in range(0, len(race_ids), IN_LIST_SIZE):
+            chunk = race_ids[start:start + IN_LIST_SIZE]
+            for table in ("laps", "participants", "races"):
+                self.cur.execute(f"DELETE FROM {table} WHERE race_id IN ({self._in_list(len(chunk))})", chunk)
+        self.commit()
+
+    def load_incremental(
+        self,
+        players: Iterable[Player],
+        races: Iterable[Race_Data],
+        race_results: Iterable[RaceResult]
+    ) -> List[LoadStats]:
+        """
+        Incremental load without dropping anything.
+
+        The schema is created/migrated in place, players are MERGE-upserted
+        (unchanged rows are not rewritten), and only races whose race_id is not
+        stored yet are inserted together with their participants and laps, in
+        one transaction, so the cost follows the new races only.
+
+        Returns:
+            List[LoadStats]: Stats of the players, races, participants and laps
+            loads; the races stats count the already stored races as `skipped`.
+        """
+        self.create_schema()
+        races, race_results, skipped = self.new_races(races, race_results)
+
+        stats = [
+            self.bulk_upsert("players", player_rows(players)),
+            self.bulk_insert("races", race_rows(races))
+        ]
+        stats[1].skipped = skipped
+        stats += self.insert_results(race_results)
+        self.commit()
+        return stats
 
     def commit(self):
         self.conn.commit()
@@ -0,0 +1,202 @@
+#functions/sqlite_handler.py:
+
+import queue
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from data.basic.handler.sql_handler import (
+    SQLHandler, BATCH_SIZE, INDEXES_SQL, OBSOLETE_INDEXES, TABLE_COLUMNS, TABLE_KEYS
+)
+
+# alapértelmezett helyi adatbázis fájl
+SQLITE_PATH = "created/sqlite/simracing.db"
+
+
+def _open(path: str) -> sqlite3.Connection:
+    if path != ":memory:":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    # a pool kapcsolatait más szálak használják; várakozás a másik író lockjára
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=60)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+class SQLitePool:
+    """
+    Local stand-in for an oracledb session pool (acquire / release / close).
+
+    SQLite allows one writer at a time on the database file and a session
+    holds the write lock until it commits, so the pooled sessions here do not
+    write in parallel: they take turns batch by batch (see `SQLiteHandler`).
+    Parallel loads on it check correctness and ordering rather than scaling.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH, sessions: int = 4):
+        self._free: queue.Queue = queue.Queue()
+        self._all = [_open(path) for _ in range(sessions)]
+        for conn in self._all:
+            self._free.put(conn)
+
+    def acquire(self) -> sqlite3.Connection:
+        return self._free.get()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._free.put(conn)
+
+    def close(self) -> None:
+        for conn in self._all:
+            conn.close()
+
+
+class SQLiteHandler(SQLHandler):
+    """
+    Local stand-in for `SQLHandler` with the same interface and schema, so the
+    bulk loader can be run and benchmarked without an Oracle instance.
+
+    SQLite has no bind type declarations or batch errors: a batch is tried in
+    one executemany inside a savepoint, and only if it fails is it replayed
+    row by row to collect the rejected rows, like `batcherrors=True` does.
+
+    On a `SQLitePool` every batch is committed (`commit_every` is forced to 1):
+    a session waiting for the write lock would otherwise time out with
+    "database is locked" while another one holds it for its whole load.
+    """
+
+    def __init__(
+        self,
+        path: str = SQLITE_PATH,
+        batch_size: int = BATCH_SIZE,
+        pool: Optional[SQLitePool] = None,
+        commit_every: Optional[int] = None
+    ):
+        # pool: egyszerre egy író, a lockot minden batch után elengedjük
+        if pool is not None:
+            commit_every = 1
+        super().__init__(batch_size, pool=pool, commit_every=commit_every)
+        self.path = path
+
+    def connect(self):
+        self.conn = self.pool.acquire() if self.pool is not None else _open(self.path)
+        self.cur = self.conn.cursor()
+        self.cur.execute("BEGIN")
+
+    def commit(self):
+        self.cur.execute("COMMIT")
+        self.cur.execute("BEGIN")
+
+    def close(self):
+        # mint Oracle alatt: a le nem commitolt munka elvész (a pool tiszta kapcsolatot kap vissza)
+        if self.conn and self.conn.in_transaction:
+            self.cur.execute("ROLLBACK")
+        super().close()
+
+    def clear_tables(self):
+        for table in ["laps", "participants", "races", "players"]:
+            self.cur.execute(f"DROP TABLE IF EXISTS {table}")
+        self.commit()
+
+    def create_schema(self):
+        """
+        Ugyanaz a séma, mint Oracle alatt (SQLite típusokkal).
+        """
+        tables_sql = {
+            "players": """
+                CREATE TABLE IF NOT EXISTS players (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT,
+                    full_name TEXT,
+                    nationality TEXT,
+                    team TEXT,
+                    elo_rating REAL,
+                    reputation REAL,
+                    race_count INTEGER
+                )
+            """,
+            "races": """
+                CREATE TABLE IF NOT EXISTS races (
+                    race_id TEXT PRIMARY KEY,
+                    track TEXT,
+                    layout TEXT,
+                    car_class TEXT,
+                    timestamp INTEGER
+                )
+            """,
+            "participants": """
+                CREATE TABLE IF NOT EXISTS participants (
+                    race_id TEXT REFERENCES races(race_id),
+                    user_id INTEGER REFERENCES players(user_id),
+                    start_position INTEGER,
+                    finish_position INTEGER,
+                    incident_points INTEGER,
+                    total_time INTEGER,
+                    rating_before REAL,
+                    rating_change REAL,
+                    reputation_before REAL,
+                    reputation_change REAL,
+                    new_rating REAL,
+                    new_rep REAL,
+                    PRIMARY KEY (race_id, user_id)
+                )
+            """,
+            "laps": """
+                CREATE TABLE IF NOT EXISTS laps (
+                    race_id TEXT REFERENCES races(race_id),
+                    user_id INTEGER REFERENCES players(user_id),
+                    lap INTEGER,
+                    time INTEGER,
+                    position INTEGER,
+                    valid TEXT,
+                    incidents TEXT,
+                    PRIMARY KEY (race_id, user_id, lap)
+                )
+            """
+        }
+
+        for sql in tables_sql.values():
+            self.cur.execute(sql)
+
+        # régebbi séma: races.timestamp hiányzik
+        self.cur.execute("PRAGMA table_info(races)")
+        if "timestamp" not in [row[1] for row in self.cur.fetchall()]:
+            self.cur.execute("ALTER TABLE races ADD COLUMN timestamp INTEGER")
+
+        for sql in INDEXES_SQL:
+            self.cur.execute(sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS"))
+        for name in OBSOLETE_INDEXES:
+            self.cur.execute(f"DROP INDEX IF EXISTS {name}")
+        self.commit()
+
+    def placeholder(self, i: int) -> str:
+        return "?"
+
+    def upsert_sql(self, table: str) -> str:
+        columns = [name for name, _ in TABLE_COLUMNS[table]]
+        keys = TABLE_KEYS[table]
+        others = [c for c in columns if c not in keys]
+        update = ", ".join(f"{c} = excluded.{c}" for c in others)
+        changed = " OR ".join(f"{table}.{c} IS NOT excluded.{c}" for c in others)
+        return (
+            f"{self.insert_sql(table)} ON CONFLICT ({', '.join(keys)}) "
+            f"DO UPDATE SET {update} WHERE {changed}"
+        )
+
+    def execute_batch(self, table: str, sql: str, rows: Sequence[tuple]) -> List[Tuple[int, str]]:
+        self.cur.execute("SAVEPOINT batch")
+        try:
+            self.cur.executemany(sql, rows)
+            self.cur.execute("RELEASE batch")
+            return []
+        except sqlite3.Error:
+            self.cur.execute("ROLLBACK TO batch")
+
+        # hibás batch: soronként újra, a jó sorok bekerülnek
+        errors = []
+        for offset, row in enumerate(rows):
+            try:
+                self.cur.execute(sql, row)
+            except sqlite3.Error as e:
+                errors.append((offset, str(e)))
+        self.cur.execute("RELEASE batch")
+        return errors
@@ -0,0 +1,164 @@
+#functions/summary_handler.py:
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from data.basic.model_classes import Player, RaceResult
+from data.basic.handler.json_handler import JSON_DIR
+from functions.unix_to_datetime import unix_to_dt
+
+# a dashboard induláskor csak ezt a fájlt olvassa (JSON_DIR alatt)
+SUMMARY_FILE = "dashboard_summary.json"
+# 3: "races" - a lefedett versenyek race_id-i (a dashboard ebből tudja, mit nem kell újraolvasnia)
+SUMMARY_VERSION = 3
+
+PARTICIPATION_COLUMNS = (
+    "race_id", "Date", "timestamp", "race_order", "track", "layout", "car_class",
+    "username", "start_position", "finish_position", "incident_points", "total_time",
+    "new_rating", "new_rep"
+)
+CAREER_COLUMNS = (
+    "username", "race_count", "rating", "reputation", "avg_finish", "finish_sum",
+    "wins", "podiums", "incident_points", "last_timestamp"
+)
+LEADERBOARD_COLUMNS = (
+    "rank", "username", "full_name", "nationality", "team", "elo_rating", "reputation", "race_count"
+)
+
+
+class DashboardSummary:
+    """
+    Compact dashboard dataset built while the season is generated.
+
+    `add_race` is called once per finished race and only appends a few values
+    per participant, so the summary costs next to nothing during generation.
+    `save` writes three column-oriented tables into one JSON file:
+
+    - participations: one row per (race, player), without laps
+    - careers: per-player aggregates (rating, reputation, avg. finish, ...)
+    - leaderboard: players in rank order (elo_rating, then reputation)
+
+    plus the race_ids of the races it covers, in `add_race` order, so the
+    dashboard knows which race files / log records it must not read again.
+    """
+
+    def __init__(self):
+        self._rows: Dict[str, List[Any]] = {c: [] for c in PARTICIPATION_COLUMNS if c != "race_order"}
+        self._careers: Dict[str, Dict[str, Any]] = {}
+        self._players: List[Player] = []
+        self._race_ids: List[str] = []
+
+    def add_race(self, rr: RaceResult) -> None:
+        self._race_ids.append(rr.race_id)
+        date = unix_to_dt(rr.timestamp)
+        rows = self._rows
+        for p in rr.participants:
+            rows["race_id"].append(rr.race_id)
+            rows["Date"].append(date)
+            rows["timestamp"].append(rr.timestamp)
+            rows["track"].append(rr.track)
+            rows["layout"].append(rr.layout)
+            rows["car_class"].append(rr.car_class)
+            rows["username"].append(p.username)
+            rows["start_position"].append(p.start_position)
+            rows["finish_position"].append(p.finish_position)
+            rows["incident_points"].append(p.incident_points)
+            rows["total_time"].append(p.total_time)
+            rows["new_rating"].append(p.new_rating)
+            rows["new_rep"].append(p.new_rep)
+
+            career = self._careers.get(p.username)
+            if career is None:
+                career = self._careers[p.username] = {
+                    "race_count": 0, "finish_sum": 0, "wins": 0, "podiums": 0,
+                    "incident_points": 0, "last_timestamp": -1, "rating": None, "reputation": None
+                }
+            career["race_count"] += 1
+            career["finish_sum"] += p.finish_position
+            career["wins"] += p.finish_position == 1
+            career["podiums"] += p.finish_position <= 3
+            career["incident_points"] += p.incident_points
+            # a legutóbbi verseny utáni rating/rep az aktuális
+            if rr.timestamp >= career["last_timestamp"]:
+                career["last_timestamp"] = rr.timestamp
+                career["rating"] = p.new_rating
+                career["reputation"] = p.new_rep
+
+    def set_players(self, players: Iterable[Player]) -> None:
+        self._players = list(players)
+
+    def to_dict(self) -> Dict[str, Any]:
+        participations = dict(self._rows)
+        # race_order: versenyek race_id szerinti sorszáma (mint a fájlnevek sorrendje)
+        order = {race_id: i for i, race_id in enumerate(sorted(set(participations["race_id"])), start=1)}
+        participations["race_order"] = [order[race_id] for race_id in participations["race_id"]]
+
+        careers: Dict[str, List[Any]] = {c: [] for c in CAREER_COLUMNS}
+        for username, c in self._careers.items():
+            careers["username"].append(username)
+            careers["race_count"].append(c["race_count"])
+            careers["rating"].append(c["rating"])
+            careers["reputation"].append(c["reputation"])
+            careers["avg_finish"].append(round(c["finish_sum"] / c["race_count"], 3))
+            careers["finish_sum"].append(c["finish_sum"])
+            careers["wins"].append(c["wins"])
+            careers["podiums"].append(c["podiums"])
+            careers["incident_points"].append(c["incident_points"])
+            careers["last_timestamp"].append(c["last_timestamp"])
+
+        leaderboard: Dict[str, List[Any]] = {c: [] for c in LEADERBOARD_COLUMNS}
+        ranked = sorted(self._players, key=lambda p: (-p.elo_rating, -p.reputation))
+        for rank, p in enumerate(ranked, start=1):
+            leaderboard["rank"].append(rank)
+            leaderboard["username"].append(p.username)
+            leaderboard["full_name"].append(p.full_name)
+            leaderboard["nationality"].append(p.nationality)
+            leaderboard["team"].append(p.team)
+            leaderboard["elo_rating"].append(p.elo_rating)
+            leaderboard["reputation"].append(p.reputation)
+            leaderboard["race_count"].append(p.race_count)
+
+        return {
+            "version": SUMMARY_VERSION,
+            "races": list(self._race_ids),
+            "participations": participations,
+            "careers": careers,
+            "leaderboard": leaderboard
+        }
+
+    def save(self, filename: str = SUMMARY_FILE, base: Path = JSON_DIR) -> Path:
+        """
+        Write the summary atomically (temp file + rename), so a running
+        dashboard never reads a half-written file.
+
+        Args:
+            filename (str): Summary file, relative to `base`.
+            base (Path): Directory of the json files (default: JSON_DIR).
+
+        Returns:
+            Path: The summary file.
+        """
+        path = Path(base) / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        return path
+
+
+def load_summary(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load a dashboard summary written by `DashboardSummary.save`.
+
+    Returns:
+        Optional[Dict[str, Any]]: The summary tables, or None if the file is
+        missing or has another version.
+    """
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if data.get("version") == SUMMARY_VERSION else None
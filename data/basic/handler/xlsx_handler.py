@@ -1,14 +1,88 @@
 #functions/xlsx.io.py:
 
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
 from pathlib import Path
-from dataclasses import asdict, is_dataclass
-from typing import List, Type, TypeVar, Dict, Any
+from dataclasses import is_dataclass
+from datetime import datetime
+from data.basic.codec import encode, decode
+from data.basic.coercion import column_converters, to_int
+from data.basic.handler.export_pipeline import fsync_path
+from data.basic.model_classes import RaceResult
+from data.basic.race_tables import RACE_CONVERTERS, PARTICIPANT_CONVERTERS, LAP_CONVERTERS, join_race_tables
+from functions.timestamp_to_unix import ts_to_unix
+from functions.datetime_to_unix import dt_to_unix
+import calendar
+import os
+import shutil
+import threading
+from typing import List, Type, TypeVar, Dict, Any, Iterable, Iterator, Optional, Callable
 import json
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
 
 T = TypeVar("T")
 
+# streaming mód: ennyi sor alapján számoljuk az oszlopszélességet, mielőtt
+# a lap első sora kiíródik (write-only lapon utólag már nem állítható)
+WIDTH_SAMPLE_ROWS = 1000
+# egy munkalap legfeljebb ennyi sort tartalmazhat (fejléccel együtt)
+EXCEL_MAX_ROWS = 1_048_576
+HEADER_STYLE = "header"
+DATA_STYLE = "data"
+
+# rögzített időbélyeg (docProps created/modified és a zip bejegyzések dátuma), hogy
+# ugyanaz a tartalom bájtra azonos fájlt adjon; None = a mentés ideje (openpyxl)
+_pinned_timestamp: Optional[datetime] = None
+
+
+def pin_timestamp(stamp: Optional[datetime]) -> None:
+    """
+    Save every following workbook with this (naive UTC) timestamp instead of
+    the current time, e.g. one derived from the run's seed, so the same data
+    gives byte-identical .xlsx files. None restores openpyxl's behaviour.
+    """
+    global _pinned_timestamp
+    _pinned_timestamp = stamp
+
+
+class _PinnedZipFile(ZipFile):
+    # minden bejegyzés ugyanazzal a dátummal (a ZipFile egyébként az aktuális / fájl időt írja)
+    def __init__(self, *args, date_time: tuple, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.date_time = date_time
+
+    def writestr(self, zinfo_or_arcname, data, compress_type=None, compresslevel=None):
+        if not isinstance(zinfo_or_arcname, ZipInfo):
+            zinfo_or_arcname = ZipInfo(zinfo_or_arcname, date_time=self.date_time)
+            zinfo_or_arcname.compress_type = self.compression
+            zinfo_or_arcname.external_attr = 0o600 << 16
+        super().writestr(zinfo_or_arcname, data, compress_type, compresslevel)
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        # write-only lapok: az ideiglenes fájl másolása, a módosítási ideje nélkül
+        zinfo = ZipInfo(arcname or os.path.basename(filename), date_time=self.date_time)
+        zinfo.compress_type = compress_type if compress_type is not None else self.compression
+        zinfo.external_attr = 0o600 << 16
+        with open(filename, "rb") as src, self.open(zinfo, "w") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _save_workbook(wb: Workbook, path: Path) -> None:
+    if _pinned_timestamp is None:
+        wb.save(path)
+        return
+    # ugyanaz, mint a Workbook.save, csak rögzített időkkel
+    if wb.write_only and not wb.worksheets:
+        wb.create_sheet()
+    wb.properties.created = wb.properties.modified = _pinned_timestamp
+    archive = _PinnedZipFile(path, "w", ZIP_DEFLATED, allowZip64=True,
+                             date_time=_pinned_timestamp.timetuple()[:6])
+    ExcelWriter(wb, archive).save()
+
 
 def _auto_width(ws) -> None:
     for col in ws.columns:
@@ -54,36 +128,41 @@ def _sheet_from_rows(wb: Workbook, name: str, rows: List[Dict[str, Any]]) -> Non
     _auto_width(ws)
 
 
-def save_xlsx(sheets: dict, filename: str) -> None:
+def _prepare_row(it: Any) -> Dict[str, Any]:
+    row = encode(it) if is_dataclass(it) else (dict(it) if isinstance(it, dict) else None)
+    if row is None:
+        # nem dict és nem dataclass: tegyük be egyetlen "value" kulcs alatt
+        row = {"value": it}
+    # lapítás: beágyazott struktúrák JSON stringgé
+    flat = {}
+    for k, v in row.items():
+        if isinstance(v, (dict, list)):
+            flat[k] = json.dumps(v, ensure_ascii=False)
+        else:
+            flat[k] = v
+    return flat
+
+
+def save_xlsx(sheets: dict, filename: str, streaming: bool = False) -> Path:
     """
     sheets: {"SheetName": [items], ...}
-    - items lehet dataclass vagy dict; dataclass -> asdict
+    - items lehet dataclass vagy dict; dataclass -> codec.encode
     - beágyazott dict/list -> JSON string
     - alap háttérszín minden cellának
     - oszlopszélesség automatikus
     - Participants lapon: rating_change/reputation_change zöld/piros, finish_position zöld/piros a start_position-hoz képest
+    - streaming=True: write-only munkafüzet, lásd `_save_xlsx_streaming`
     """
+    if streaming:
+        return _save_xlsx_streaming(sheets, filename)
+
     wb = Workbook()
     wb.remove(wb.active)
 
     # előkészítés: dataclass -> dict, nested -> json string
-    prepared: Dict[str, List[Dict[str, Any]]] = {}
-    for name, items in sheets.items():
-        rows: List[Dict[str, Any]] = []
-        for it in items:
-            row = asdict(it) if is_dataclass(it) else (dict(it) if isinstance(it, dict) else None)
-            if row is None:
-                # nem dict és nem dataclass: tegyük be egyetlen "value" kulcs alatt
-                row = {"value": it}
-            # lapítás: beágyazott struktúrák JSON stringgé
-            flat = {}
-            for k, v in row.items():
-                if isinstance(v, (dict, list)):
-                    flat[k] = json.dumps(v, ensure_ascii=False)
-                else:
-                    flat[k] = v
-            rows.append(flat)
-        prepared[name] = rows
+    prepared: Dict[str, List[Dict[str, Any]]] = {
+        name: [_prepare_row(it) for it in items] for name, items in sheets.items()
+    }
 
     # írjuk a lapokat
     for name, rows in prepared.items():
@@ -155,20 +234,330 @@ def save_xlsx(sheets: dict, filename: str) -> None:
 
     path = Path("created/xlsxs") / filename
     path.parent.mkdir(parents=True, exist_ok=True)
-    wb.save(path)
+    _save_workbook(wb, path)
+    return path
+
+
+# --- beolvasás (read-only mód) ---
+
+def _sheet_parts(wb, sheet: str) -> List[str]:
+    """The sheet and its rollover parts (`<sheet>_2`, `<sheet>_3`, ...)."""
+    parts = [sheet]
+    while f"{sheet}_{len(parts) + 1}" in wb.sheetnames:
+        parts.append(f"{sheet}_{len(parts) + 1}")
+    return parts
+
+
+def _iter_rows(wb, sheet: str, converters: Dict[str, Callable[[Any], Any]]) -> Iterator[Dict[str, Any]]:
+    for part in _sheet_parts(wb, sheet):
+        rows = wb[part].iter_rows(values_only=True)
+        headers = next(rows, None)
+        if headers is None:
+            continue
+        convs = [converters.get(h) for h in headers]
+        for values in rows:
+            if all(v is None for v in values):
+                continue  # kézzel törölt sor
+            yield {h: (c(v) if c is not None else v) for h, c, v in zip(headers, convs, values)}
 
 
-def load_xlsx(filename: str, sheet: str, cls: Type[T]) -> List[T]:
+def load_xlsx(
+    filename: str,
+    sheet: str,
+    cls: Type[T],
+    converters: Optional[Dict[str, Callable[[Any], Any]]] = None
+) -> List[T]:
+    """
+    Load one sheet (with its rollover parts) into dataclass instances.
+
+    The workbook is opened read-only and streamed by values; every column is
+    coerced to the type of its dataclass field, so analyst-edited cells
+    ("12" as text, 3.0 as float, "TRUE") still load cleanly.
+
+    Args:
+        filename (str): Path under created/xlsxs.
+        sheet (str): Sheet name.
+        cls (Type[T]): Target dataclass.
+        converters (Optional[Dict[str, Callable]]): Per-column overrides.
+
+    Returns:
+        List[T]: The loaded objects.
+    """
     path = Path("created/xlsxs") / filename
-    wb = load_workbook(path)
-    ws = wb[sheet]
-    rows = list(ws.rows)
-    if not rows:
-        return []
-    headers = [cell.value for cell in rows[0]]
-    result = []
-    for row in rows[1:]:
-        values = [cell.value for cell in row]
-        data = dict(zip(headers, values))
-        result.append(cls(**data))
-    return result
+    convs = column_converters(cls)
+    if converters:
+        convs.update(converters)
+    wb = load_workbook(path, read_only=True)
+    try:
+        return [decode(cls, data) for data in _iter_rows(wb, sheet, convs)]
+    finally:
+        wb.close()
+
+
+def _time_ms(v: Any) -> Any:
+    # idő cella: "perc:mp:ezredmp" string vagy már ms
+    return ts_to_unix(v) if isinstance(v, str) else to_int(v)
+
+
+def _timestamp_ms(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return calendar.timegm(v.timetuple()) * 1000
+    return dt_to_unix(v) if isinstance(v, str) else to_int(v)
+
+
+# a közös konverterek (race_tables), csak az idők formázott cellákból jönnek
+_RACE_CONVERTERS = {**RACE_CONVERTERS, "timestamp": _timestamp_ms}
+_PARTICIPANT_CONVERTERS = {**PARTICIPANT_CONVERTERS, "total_time": _time_ms}
+_LAP_CONVERTERS = {**LAP_CONVERTERS, "time": _time_ms}
+
+
+def load_race_results(filename: str) -> List[RaceResult]:
+    """
+    Rebuild full `RaceResult` objects from a results workbook.
+
+    Joins the race sheet ("RaceResult" in per-race files, "Races" in the season
+    workbook), Participants and Laps on race_id / user_id, parsing the
+    formatted times back to milliseconds. Rollover sheets are included.
+    Rows deleted or filtered out by hand are expected here: Participants /
+    Laps rows whose race or participant is gone are skipped with a warning.
+
+    Args:
+        filename (str): Path under created/xlsxs.
+
+    Returns:
+        List[RaceResult]: Races in sheet order, participants and laps attached.
+    """
+    path = Path("created/xlsxs") / filename
+    wb = load_workbook(path, read_only=True)
+    try:
+        race_sheet = "RaceResult" if "RaceResult" in wb.sheetnames else "Races"
+        return join_race_tables(
+            _iter_rows(wb, race_sheet, _RACE_CONVERTERS),
+            _iter_rows(wb, "Participants", _PARTICIPANT_CONVERTERS),
+            _iter_rows(wb, "Laps", _LAP_CONVERTERS),
+            skip_orphans=True
+        )
+    finally:
+        wb.close()
+
+
+# --- streaming (write-only) mód ---
+
+def _register_styles(wb: Workbook) -> None:
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(bold=True, color="FFFFFF")
+    header.alignment = Alignment(horizontal="center")
+    header.fill = PatternFill("solid", fgColor="4F81BD")  # kék
+    data = NamedStyle(name=DATA_STYLE)
+    data.fill = PatternFill("solid", fgColor="DDDDDD")
+    wb.add_named_style(header)
+    wb.add_named_style(data)
+
+
+def _styled_row(ws, values: Iterable[Any], style: str) -> List[WriteOnlyCell]:
+    cells = []
+    for v in values:
+        cell = WriteOnlyCell(ws, value=v)
+        cell.style = style
+        cells.append(cell)
+    return cells
+
+
+def _add_participants_rules(ws, headers: List[str], last_row: int) -> None:
+    """Green/red colouring of the Participants sheet as conditional formatting rules."""
+    if last_row < 2:
+        return
+    green_fill = PatternFill("solid", start_color="C6EFCE", end_color="C6EFCE")
+    red_fill = PatternFill("solid", start_color="FFC7CE", end_color="FFC7CE")
+
+    for col in ("rating_change", "reputation_change"):
+        if col in headers:
+            letter = get_column_letter(headers.index(col) + 1)
+            cells = f"{letter}2:{letter}{last_row}"
+            ws.conditional_formatting.add(cells, CellIsRule(operator="greaterThan", formula=["0"], fill=green_fill))
+            ws.conditional_formatting.add(cells, CellIsRule(operator="lessThan", formula=["0"], fill=red_fill))
+
+    # pozíció változás: finish vs start
+    if "start_position" in headers and "finish_position" in headers:
+        start = get_column_letter(headers.index("start_position") + 1)
+        finish = get_column_letter(headers.index("finish_position") + 1)
+        cells = f"{finish}2:{finish}{last_row}"
+        ws.conditional_formatting.add(cells, FormulaRule(formula=[f"{finish}2<{start}2"], fill=green_fill))
+        ws.conditional_formatting.add(cells, FormulaRule(formula=[f"{finish}2>{start}2"], fill=red_fill))
+
+
+class _SheetStream:
+    """
+    Write-only sheet fed row by row.
+
+    The first WIDTH_SAMPLE_ROWS rows are buffered to size the columns, then
+    everything is streamed. Past `max_rows` (header included) the sheet rolls
+    over to `<name>_2`, `<name>_3`, ... with the same header and widths.
+    """
+
+    def __init__(self, wb: Workbook, name: str, max_rows: int = EXCEL_MAX_ROWS):
+        self.wb = wb
+        self.name = name
+        self.max_rows = max_rows
+        self.headers: List[str] = []
+        self.widths: List[int] = []
+        self._sample: List[List[Any]] = []
+        # a lapfül azonnal létrejön (lapsorrend), a fejléc az első sorral
+        self._ws = wb.create_sheet(title=name)
+        self._rows = 0
+        self._parts = 1
+
+    def append(self, row: Dict[str, Any]) -> None:
+        if not self.headers:
+            self.headers = list(row.keys())
+            self.widths = [len(str(h)) for h in self.headers]
+
+        vals = [row.get(h) for h in self.headers]
+        # szélesség számolás menet közben, soronként
+        for i, v in enumerate(vals):
+            if v is not None:
+                n = len(str(v))
+                if n > self.widths[i]:
+                    self.widths[i] = n
+
+        if self._rows == 0 and len(self._sample) < WIDTH_SAMPLE_ROWS:
+            self._sample.append(vals)
+            return
+        self._drain()
+        self._write(vals)
+
+    def _drain(self) -> None:
+        sample, self._sample = self._sample, []
+        for vals in sample:
+            self._write(vals)
+
+    def _write(self, vals: List[Any]) -> None:
+        if self._rows == 0:
+            self._start_part()
+        elif self._rows >= self.max_rows:
+            self._finish_part()
+            self._parts += 1
+            self._ws = self.wb.create_sheet(title=f"{self.name}_{self._parts}")
+            self._start_part()
+        self._ws.append(_styled_row(self._ws, vals, DATA_STYLE))
+        self._rows += 1
+
+    def _start_part(self) -> None:
+        # write-only lapon a szélességet az első append előtt kell megadni
+        for i, w in enumerate(self.widths, start=1):
+            self._ws.column_dimensions[get_column_letter(i)].width = w + 2
+        self._ws.append(_styled_row(self._ws, self.headers, HEADER_STYLE))
+        self._rows = 1
+
+    def _finish_part(self) -> None:
+        if self.name == "Participants":
+            _add_participants_rules(self._ws, self.headers, self._rows)
+
+    def close(self) -> None:
+        self._drain()
+        self._finish_part()
+
+
+def _save_xlsx_streaming(sheets: Dict[str, Iterable[Any]], filename: str) -> Path:
+    """
+    Write-only variant of `save_xlsx`: rows are streamed straight into the file,
+    so memory stays flat regardless of sheet size.
+
+    - fejléc/adat formázás named style-okkal (nem cellánkénti fill objektumokkal)
+    - Participants színezés Excel feltételes formázási szabályokkal
+    - oszlopszélesség menet közben számolva, az első WIDTH_SAMPLE_ROWS sor alapján
+    - a lapok elemei tetszőleges iterable-ből (generátorból is) jöhetnek
+    """
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    for name, items in sheets.items():
+        stream = _SheetStream(wb, name)
+        for it in items:
+            stream.append(_prepare_row(it))
+        stream.close()
+
+    path = Path("created/xlsxs") / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _save_workbook(wb, path)
+    return path
+
+
+class SeasonWorkbook:
+    """
+    One streaming workbook for a whole season.
+
+    Every `append` adds one race's rows (e.g. `{"Races": [...], "Participants":
+    [...], "Laps": [...]}`) to the combined sheets, keyed by their `race_id`
+    column; nothing is written per race, the file is saved once on `close`.
+    Sheets over the Excel row limit roll over to `<name>_2`, ... Appends are
+    serialized, rows keep the order in which races are appended.
+
+    Usage:
+        with SeasonWorkbook("race_results/season.xlsx") as season:
+            for rr in results:
+                season.append(race_sheets(rr))
+    """
+
+    def __init__(self, filename: str, sheet_names: Iterable[str] = (), max_rows: int = EXCEL_MAX_ROWS):
+        self.path = Path("created/xlsxs") / filename
+        self._wb = Workbook(write_only=True)
+        _register_styles(self._wb)
+        self._max_rows = max_rows
+        self._sheets: Dict[str, _SheetStream] = {}
+        self._lock = threading.Lock()
+        # a lapok sorrendje rögzíthető előre
+        for name in sheet_names:
+            self._sheet(name)
+
+    def _sheet(self, name: str) -> _SheetStream:
+        stream = self._sheets.get(name)
+        if stream is None:
+            stream = self._sheets[name] = _SheetStream(self._wb, name, self._max_rows)
+        return stream
+
+    def append(self, sheets: Dict[str, Iterable[Any]]) -> None:
+        """Append one race's rows to the season sheets."""
+        with self._lock:
+            for name, items in sheets.items():
+                stream = self._sheet(name)
+                for it in items:
+                    stream.append(_prepare_row(it))
+
+    def _save_partial(self) -> Path:
+        # mentés <név>.partial-ba: a write-only lapok ideiglenes fájljait az openpyxl itt takarítja el
+        partial = self.path.with_name(self.path.name + ".partial")
+        for stream in self._sheets.values():
+            stream.close()
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        _save_workbook(self._wb, partial)
+        self._wb = None
+        return partial
+
+    def close(self) -> Optional[Path]:
+        """Write the workbook to disk (saved and fsynced) and return its path."""
+        with self._lock:
+            if self._wb is None:
+                return None
+            partial = self._save_partial()
+            # a versenyenkénti fájlokat az ExportPipeline fsync-eli, ezt itt kell
+            fsync_path(partial)
+            os.replace(partial, self.path)
+            return self.path
+
+    def discard(self) -> None:
+        """Drop the workbook (after a failed run): nothing is written to its path."""
+        with self._lock:
+            if self._wb is None:
+                return
+            self._save_partial().unlink()
+            # egy korábbi futás munkafüzete se maradjon itt a hibás futás eredményeként
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "SeasonWorkbook":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
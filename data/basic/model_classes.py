@@ -1,9 +1,11 @@
 #/data/basic/model_classes.py:
 
-from dataclasses import dataclass
-from typing import List, Dict
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Sequence, Tuple, Union
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     USER_ID: int
     username: str
@@ -14,7 +16,7 @@ class Player:
     reputation: float = 75
     race_count: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Race_Data:
     RACE_ID: str
     track: str
@@ -22,7 +24,7 @@ class Race_Data:
     car_class: str
     timestamp: int   # új mező: UNIX epoch ms
 
-@dataclass
+@dataclass(slots=True)
 class Lap:
     lap: int
     time: int
@@ -30,7 +32,284 @@ class Lap:
     position: int
     incidents: List[str]
 
-@dataclass
+
+# --- tömör kör-tárolás ---
+# Körönként az incidensek sorrendben, 4 bites kódokként (incidents.json index + 1)
+# egy 32 bites egészbe pakolva; így az ismétlődő incidens (pl. 2x Contact) sem vész el.
+INCIDENT_BITS = 4
+MAX_INCIDENTS_PER_LAP = 32 // INCIDENT_BITS
+
+
+@lru_cache(maxsize=None)
+def incident_names() -> Tuple[str, ...]:
+    """Incident names in incidents.json order (the code of an incident is its index + 1)."""
+    from data.basic.catalog import get_catalog
+    return tuple(get_catalog().incidents.keys())
+
+
+@lru_cache(maxsize=None)
+def _incident_codes() -> Dict[str, int]:
+    return {name: i + 1 for i, name in enumerate(incident_names())}
+
+
+def encode_incidents(incidents: Sequence[str]) -> int:
+    if len(incidents) > MAX_INCIDENTS_PER_LAP:
+        raise ValueError(f"At most {MAX_INCIDENTS_PER_LAP} incidents fit into one lap, got {len(incidents)}")
+    codes = _incident_codes()
+    packed = 0
+    for slot, name in enumerate(incidents):
+        packed |= codes[name] << (slot * INCIDENT_BITS)
+    return packed
+
+
+def decode_incidents(packed: int) -> List[str]:
+    names = incident_names()
+    incidents: List[str] = []
+    while packed:
+        incidents.append(names[(packed & 0xF) - 1])
+        packed >>= INCIDENT_BITS
+    return incidents
+
+
+class LapView:
+    """`Lap`-compatible view of one lap inside a `LapBlock`."""
+    __slots__ = ("_block", "_index")
+
+    def __init__(self, block: "LapBlock", index: int):
+        self._block = block
+        self._index = index
+
+    @property
+    def _at(self) -> int:
+        # a lap indexe a verseny oszlopaiban
+        return self._block.start + self._index
+
+    @property
+    def lap(self) -> int:
+        return self._index + 1
+
+    @property
+    def time(self) -> int:
+        return self._block.race.times[self._at]
+
+    @time.setter
+    def time(self, value: int) -> None:
+        self._block.race.times[self._at] = value
+
+    @property
+    def valid(self) -> bool:
+        return bool(self._block.race.valid[self._at])
+
+    @valid.setter
+    def valid(self, value: bool) -> None:
+        self._block.race.valid[self._at] = bool(value)
+
+    @property
+    def position(self) -> Optional[int]:
+        pos = self._block.race.positions[self._at]
+        return pos if pos else None
+
+    @position.setter
+    def position(self, value: Optional[int]) -> None:
+        self._block.race.positions[self._at] = value or 0
+
+    @property
+    def incidents(self) -> List[str]:
+        return decode_incidents(self._block.race.incident_codes[self._at])
+
+    @incidents.setter
+    def incidents(self, value: Sequence[str]) -> None:
+        self._block.race.incident_codes[self._at] = encode_incidents(value)
+
+    def to_lap(self) -> Lap:
+        return Lap(self.lap, self.time, self.valid, self.position, self.incidents)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (Lap, LapView)):
+            return (self.lap, self.time, self.valid, self.position, self.incidents) == \
+                   (other.lap, other.time, other.valid, other.position, other.incidents)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_lap())
+
+
+class RaceLaps:
+    """
+    Column-oriented storage of all laps of one race, participant after participant.
+
+    Time (int32 ms), position (int16, 0 = not set yet), valid and the packed
+    incident codes live in four `array` columns, 11 bytes per lap; a single set
+    of columns per race instead of per participant keeps the fixed cost of the
+    arrays off every participant. Each participant gets a `LapBlock` window
+    from `add`.
+
+    The typecodes double as numpy dtype codes, so `vectorized_laps` can fill
+    the columns straight from its matrices (`extend_from_buffers`).
+    """
+    __slots__ = ("times", "positions", "valid", "incident_codes")
+
+    TIME_TYPECODE = "i"
+    POSITION_TYPECODE = "h"
+    VALID_TYPECODE = "b"
+    CODE_TYPECODE = "I"
+
+    def __init__(self):
+        self.times = array(self.TIME_TYPECODE)
+        self.positions = array(self.POSITION_TYPECODE)
+        self.valid = array(self.VALID_TYPECODE)
+        self.incident_codes = array(self.CODE_TYPECODE)
+
+    def add(
+        self,
+        times: Iterable[int],
+        valid: Iterable[bool],
+        incident_codes: Iterable[int],
+        positions: Optional[Iterable[int]] = None
+    ) -> "LapBlock":
+        """
+        Append one participant's laps and return the window over them.
+
+        Args:
+            times (Iterable[int]): Lap times, ms.
+            valid (Iterable[bool]): Lap validity flags.
+            incident_codes (Iterable[int]): Packed incidents (`encode_incidents`).
+            positions (Iterable[int], optional): Positions; 0 (not set) when omitted.
+
+        Returns:
+            LapBlock: The participant's laps.
+        """
+        start = len(self.times)
+        self.times.extend(times)
+        self.valid.extend(valid)
+        self.incident_codes.extend(incident_codes)
+        stop = len(self.times)
+        if positions is not None:
+            self.positions.extend(positions)
+        else:
+            self.positions.frombytes(bytes(self.positions.itemsize * (stop - start)))
+        if not len(self.valid) == len(self.incident_codes) == len(self.positions) == stop:
+            raise ValueError("Lap columns of one participant must have the same length")
+        return LapBlock(self, start, stop)
+
+    def extend_from_buffers(self, times: Any, valid: Any, incident_codes: Any, n_laps: int) -> List["LapBlock"]:
+        """
+        Append a whole participants x laps grid from C-contiguous buffers
+        (e.g. numpy arrays of the column typecodes), row by row.
+
+        Args:
+            times (Any): Lap times, buffer of TIME_TYPECODE items.
+            valid (Any): Validity flags, buffer of VALID_TYPECODE items.
+            incident_codes (Any): Packed incidents, buffer of CODE_TYPECODE items.
+            n_laps (int): Laps per participant (row length).
+
+        Returns:
+            List[LapBlock]: One window per row.
+        """
+        start = len(self.times)
+        # sorfolytonos (akár 2D) puffer -> bájtok, másolás nélkül
+        self.times.frombytes(memoryview(times).cast("B"))
+        self.valid.frombytes(memoryview(valid).cast("B"))
+        self.incident_codes.frombytes(memoryview(incident_codes).cast("B"))
+        stop = len(self.times)
+        self.positions.frombytes(bytes(self.positions.itemsize * (stop - start)))
+        if not len(self.valid) == len(self.incident_codes) == stop:
+            raise ValueError("Lap column buffers must have the same length")
+        return [LapBlock(self, i, i + n_laps) for i in range(start, stop, n_laps)] if n_laps else []
+
+
+class LapBlock:
+    """
+    One participant's laps: a window (`start`..`stop`) over the columns of
+    its race (`RaceLaps`).
+
+    Lap numbers are implicit (1..n). The `times`, `positions`, `valid` and
+    `incident_codes` properties are writable memoryview slices of the race
+    columns. Indexing and iteration yield `LapView` objects, so code written
+    for `List[Lap]` keeps working (including `laps[i].position = x`).
+    """
+    __slots__ = ("race", "start", "stop")
+
+    def __init__(self, race: RaceLaps, start: int, stop: int):
+        self.race = race
+        self.start = start
+        self.stop = stop
+
+    @classmethod
+    def from_columns(
+        cls,
+        times: Iterable[int],
+        valid: Iterable[bool],
+        incident_codes: Iterable[int],
+        positions: Optional[Iterable[int]] = None
+    ) -> "LapBlock":
+        """Standalone block (with its own `RaceLaps`) from column values."""
+        return RaceLaps().add(times, valid, incident_codes, positions)
+
+    @classmethod
+    def from_laps(cls, laps: Iterable[Union[Lap, LapView]], race: Optional[RaceLaps] = None) -> "LapBlock":
+        """Block from `Lap`-like objects, appended to `race` (a new one when omitted)."""
+        laps = list(laps)
+        return (race if race is not None else RaceLaps()).add(
+            (l.time for l in laps),
+            (l.valid for l in laps),
+            (encode_incidents(l.incidents) for l in laps),
+            (l.position or 0 for l in laps)
+        )
+
+    @property
+    def times(self) -> memoryview:
+        return memoryview(self.race.times)[self.start:self.stop]
+
+    @property
+    def positions(self) -> memoryview:
+        return memoryview(self.race.positions)[self.start:self.stop]
+
+    @property
+    def valid(self) -> memoryview:
+        return memoryview(self.race.valid)[self.start:self.stop]
+
+    @property
+    def incident_codes(self) -> memoryview:
+        return memoryview(self.race.incident_codes)[self.start:self.stop]
+
+    def set_positions(self, positions: Iterable[int]) -> None:
+        self.race.positions[self.start:self.stop] = array(RaceLaps.POSITION_TYPECODE, positions)
+
+    def valid_count(self) -> int:
+        return self.race.valid[self.start:self.stop].count(1)
+
+    def to_laps(self) -> List[Lap]:
+        return [view.to_lap() for view in self]
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[LapView, List[LapView]]:
+        if isinstance(index, slice):
+            return [LapView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("lap index out of range")
+        return LapView(self, index)
+
+    def __iter__(self) -> Iterator[LapView]:
+        return (LapView(self, i) for i in range(len(self)))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LapBlock):
+            return (self.times, self.positions, self.valid, self.incident_codes) == \
+                   (other.times, other.positions, other.valid, other.incident_codes)
+        if isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_laps())
+
+
+@dataclass(slots=True)
 class ParticipantResult:
     user_id: int
     username: str
@@ -39,11 +318,11 @@ class ParticipantResult:
     incident_points: int
     total_time: int
     results: Dict[str, float]
-    laps: List[Lap]
+    laps: Union[List[Lap], LapBlock]
     new_rating: float = 0.0
     new_rep: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class RaceResult:
     race_id: str
     track: str
@@ -51,3 +330,7 @@ class RaceResult:
     car_class: str
     timestamp: int   # új mező: UNIX epoch ms
     participants: List[ParticipantResult]
+    # generators.race_timeline.RaceTimeline (körönkénti gap / interval, sor = start_position - 1),
+    # ha kérték; nem része az exportoknak
+    timeline: Optional[Any] = field(default=None, compare=False, repr=False, metadata={"export": False})
+
@@ -0,0 +1,133 @@
+#data/basic/race_tables.py:
+
+import logging
+from typing import Any, Dict, Iterable, List
+
+from data.basic.coercion import column_converters, to_float, to_int, to_str
+from data.basic.model_classes import Lap, ParticipantResult, RaceResult
+
+# Normalizált versenyeredmény táblák (races / participants / laps, race_id és
+# user_id kulcsokkal) visszaépítése RaceResult objektumokká. A CSV és az XLSX
+# betöltő ugyanezt a joint használja, csak a sorok forrása és néhány
+# konverter (formázott idők) tér el.
+
+
+def incidents_from_cell(v: Any) -> List[str]:
+    # "Off track, Contact" -> ["Off track", "Contact"]
+    if not v:
+        return []
+    return [name.strip() for name in str(v).split(",") if name.strip()]
+
+
+RACE_CONVERTERS = column_converters(RaceResult)
+PARTICIPANT_CONVERTERS = {
+    **column_converters(ParticipantResult),
+    "race_id": to_str,
+    "rating_before": to_float,
+    "rating_change": to_float,
+    "reputation_before": to_float,
+    "reputation_change": to_float
+}
+LAP_CONVERTERS = {
+    **column_converters(Lap),
+    "race_id": to_str,
+    "user_id": to_int,
+    "incidents": incidents_from_cell
+}
+
+
+def join_race_tables(
+    races: Iterable[Dict[str, Any]],
+    participants: Iterable[Dict[str, Any]],
+    laps: Iterable[Dict[str, Any]],
+    skip_orphans: bool = False
+) -> List[RaceResult]:
+    """
+    Rebuild `RaceResult` objects from typed table rows in one linear pass per
+    table (hash join on race_id / user_id). Every participant's laps are
+    sorted by lap number, since edited tables may have reordered rows.
+
+    A participant row whose race is missing, or a lap row whose participant is
+    missing (a truncated or hand-edited table), raises a ValueError naming the
+    table, the row (1-based, header not counted) and the key; with
+    `skip_orphans` the row is left out instead, and one warning per table
+    reports how many rows were skipped.
+
+    Args:
+        races (Iterable[Dict[str, Any]]): Race rows (see RACE_CONVERTERS).
+        participants (Iterable[Dict[str, Any]]): Participant rows.
+        laps (Iterable[Dict[str, Any]]): Lap rows.
+        skip_orphans (bool): Skip rows without a parent row instead of raising.
+
+    Returns:
+        List[RaceResult]: Races in table order, participants and laps attached.
+
+    Raises:
+        ValueError: On a participant or lap row without a parent row
+            (unless `skip_orphans`).
+    """
+    # tábla -> [kihagyott sorok száma, az első ilyen sor leírása]
+    skipped: Dict[str, list] = {}
+
+    def orphan(table: str, message: str) -> None:
+        if not skip_orphans:
+            raise ValueError(message)
+        skipped.setdefault(table, [0, message])[0] += 1
+
+    by_id: Dict[str, RaceResult] = {}
+    for row in races:
+        by_id[row["race_id"]] = RaceResult(
+            race_id=row["race_id"],
+            track=row["track"],
+            layout=row["layout"],
+            car_class=row["car_class"],
+            timestamp=row["timestamp"],
+            participants=[]
+        )
+
+    by_key: Dict[tuple, ParticipantResult] = {}
+    for n, row in enumerate(participants, start=1):
+        race = by_id.get(row["race_id"])
+        if race is None:
+            orphan("participants", f"participants row {n}: race_id {row['race_id']!r} is not in races")
+            continue
+        part = ParticipantResult(
+            user_id=row["user_id"],
+            username=row["username"],
+            start_position=row["start_position"],
+            finish_position=row["finish_position"],
+            incident_points=row["incident_points"],
+            total_time=row["total_time"],
+            results={
+                "rating_before": row["rating_before"],
+                "reputation_before": row["reputation_before"],
+                "rating_change": row["rating_change"],
+                "reputation_change": row["reputation_change"]
+            },
+            laps=[],
+            new_rating=row["new_rating"],
+            new_rep=row["new_rep"]
+        )
+        race.participants.append(part)
+        by_key[(row["race_id"], part.user_id)] = part
+
+    for n, row in enumerate(laps, start=1):
+        key = (row["race_id"], row["user_id"])
+        part = by_key.get(key)
+        if part is None:
+            orphan("laps", f"laps row {n}: (race_id, user_id) {key!r} is not in participants")
+            continue
+        part.laps.append(Lap(
+            lap=row["lap"],
+            time=row["time"],
+            valid=row["valid"],
+            position=row["position"],
+            incidents=row["incidents"]
+        ))
+
+    for table, (count, first) in skipped.items():
+        logging.warning(f"Skipped {count} {table} rows without a parent row (first: {first})")
+
+    for part in by_key.values():
+        part.laps.sort(key=lambda l: l.lap)
+    return list(by_id.values())
@@ -0,0 +1,19 @@
+#functions/datetime_to_unix.py:
+
+import calendar
+from datetime import datetime
+
+def dt_to_unix(dt_str: str) -> int:
+    """
+    Parse a "YY.MM.DD - hh:mm:ss" date string (see `unix_to_dt`) back into Unix time.
+
+    Args:
+        dt_str (str): Formatted UTC date string.
+
+    Returns:
+        int: Unix time in milliseconds (second resolution, like the string).
+    """
+    dt = datetime.strptime(dt_str.strip(), "%y.%m.%d - %H:%M:%S")
+
+    # a string UTC időt ír le
+    return calendar.timegm(dt.timetuple()) * 1000
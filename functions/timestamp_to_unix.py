@@ -0,0 +1,14 @@
+#functions/timestamp_to_unix.py:
+
+def ts_to_unix(ts: str) -> int:
+    """
+    Parse a lap time in perc:mp:ezredmp form (see `unix_to_ts`) back into milliseconds.
+
+    Args:
+        ts (str): Time string "minutes:seconds:milliseconds".
+
+    Returns:
+        int: Time in milliseconds.
+    """
+    minutes, seconds, milliseconds = ts.strip().split(":")
+    return int(minutes) * 60000 + int(seconds) * 1000 + int(milliseconds)
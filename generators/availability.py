@@ -0,0 +1,66 @@
+#generators/availability.py:
+
+import heapq
+import random
+from itertools import count
+from typing import List, Optional, Sequence, Tuple
+
+from data.basic.model_classes import Player
+
+
+class AvailabilityIndex:
+    """
+    Free/busy index of the player pool.
+
+    Busy players sit in a min-heap keyed on the time they become free again;
+    free players sit in a plain list, so drawing k of them is a sample of k
+    indices plus swap-removals. Per race this costs O(k log P) instead of a
+    scan over every player.
+    """
+
+    def __init__(self, players: Sequence[Player]):
+        self._free: List[Player] = list(players)
+        self._busy: List[Tuple[int, int, Player]] = []
+        # azonos free_at esetén a beszúrási sorrend dönt (determinisztikus)
+        self._seq = count()
+
+    def __len__(self) -> int:
+        return len(self._free) + len(self._busy)
+
+    def release_until(self, ts: int) -> int:
+        """Move every player whose free-at time is <= ts back to the free pool."""
+        released = 0
+        while self._busy and self._busy[0][0] <= ts:
+            _, _, player = heapq.heappop(self._busy)
+            self._free.append(player)
+            released += 1
+        return released
+
+    def free_count(self, ts: int) -> int:
+        self.release_until(ts)
+        return len(self._free)
+
+    def acquire(self, k: int, ts: int, rng=random) -> Optional[List[Player]]:
+        """
+        Draw k random players who are free at `ts`.
+
+        Returns:
+            Optional[List[Player]]: The drawn players, or None when fewer than
+            k players are free (nothing is taken in that case).
+        """
+        self.release_until(ts)
+        if len(self._free) < k:
+            return None
+
+        picks = rng.sample(range(len(self._free)), k)
+        players = [self._free[i] for i in picks]
+        # csökkenő indexek: a lista végéről áthúzott elem mindig még szabad
+        for i in sorted(picks, reverse=True):
+            self._free[i] = self._free[-1]
+            self._free.pop()
+        return players
+
+    def occupy(self, players: Sequence[Player], until_ts: int) -> None:
+        """Mark the players busy until `until_ts`."""
+        for p in players:
+            heapq.heappush(self._busy, (until_ts, next(self._seq), p))
@@ -1,65 +1,194 @@
 #generators/player_generator.py:
 
-import json
 import random
-from typing import List
-from pathlib import Path
+from functools import lru_cache
+from itertools import accumulate
+from math import gcd
+from typing import Dict, Iterator, List, Sequence, Tuple
 from faker import Faker
+from faker.providers.person import Provider as PersonProvider
+from data.basic.catalog import get_catalog
 from data.basic.model_classes import Player
 
-def generate_players(n: int) -> List[Player]:
-    DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
-    with open(DATA_DIR / "locale_map.json", "r", encoding="utf-8") as f:
-        countries = json.load(f)
+# ennyi játékos nevét / suffixét / csapatát húzzuk egyszerre
+PLAYER_BATCH_SIZE = 10_000
 
-    fakers = {c: Faker(locale=loc) for c, loc in countries.items()}
-    players: List[Player] = []
-    used_ids = set()
+# 8 jegyű user_id tartomány
+USER_ID_MIN = 10_000_000
+USER_ID_MAX = 99_999_999
 
-    for _ in range(n):
-        country = random.choice(list(countries.keys()))
-        fake = fakers[country]
+# --- súlyozott táblák (egyszer épülnek, nem játékosonként) ---
 
-        fn, ln = fake.first_name_male(), fake.last_name_male()
-        full_name = f"{fn} {ln}"
+# alap suffixek: 50 véletlen szám 0-99 között, "33"/"44" 2-2 extra, nickek 1-1
+BASE_SUFFIXES: Dict[str, float] = {str(i): 0.5 for i in range(100)}
+BASE_SUFFIXES["33"] += 2
+BASE_SUFFIXES["44"] += 2
+for _nick in ["the_goat", "max", "PR0F", "the_ApexHunter", "ChicaneKing", "Slipstreamer",
+              "on_twitch", "twitch", "yt", "Cr1t1c4l", "HS", "b00st3d"]:
+    BASE_SUFFIXES[_nick] = 1
 
-        # alap suffixek
-        base_suffixes = (
-            [str(random.randint(0, 99)) for _ in range(50)]
-            + ["33", "44"] * 2
-            + ["the_goat", "max", "PR0F", "the_ApexHunter", "ChicaneKing", "Slipstreamer", "on_twitch", "twitch", "yt", "Cr1t1c4l", "HS", "b00st3d"]
-        )
+# magyar specifikus nickek (5x súllyal)
+HUNGARIAN_SUFFIXES = dict(BASE_SUFFIXES)
+for _nick in ["KedvesPalacsinta", "GamerHU", "HU", "hu", "Hu", "a_kuposzto", "a_vaci_ut_kiralya", "PEC"]:
+    HUNGARIAN_SUFFIXES[_nick] = HUNGARIAN_SUFFIXES.get(_nick, 0) + 5
 
-        # magyar specifikus nickek
-        hungarian_suffixes = ["KedvesPalacsinta", "GamerHU", "HU", "hu", "Hu", "a_kuposzto", "a_vaci_ut_kiralya", "PEC"]
+# team: 50% PRIVATEER, 45% ismert csapat, 5-5% a játékos nevéből képzett
+TEAM_SUFFIXES = ["SIM RACING", "ESPORT", "RACING", "Motorsport", "Racing Team"]
+TEAM_TEMPLATES: Dict[str, float] = {"PRIVATEER": 50}
+for _team in ["TEAM REDLINE", "APEX HUNTERS", "Low Fuel Motorsport", "PetrolHead Simracing"]:
+    TEAM_TEMPLATES[_team] = 45 / 4
+TEAM_TEMPLATES["TEAM {name}"] = 5
+TEAM_TEMPLATES["{name} {suffix}"] = 5
 
-        if country == "Hungary":
-            username_suffixes = base_suffixes + hungarian_suffixes * 5
+
+def _table(weights: Dict[str, float]) -> Tuple[List[str], List[float]]:
+    # random.choices kumulált súlyokkal: nem számolja újra húzásonként
+    return list(weights), list(accumulate(weights.values()))
+
+
+_BASE_SUFFIX_TABLE = _table(BASE_SUFFIXES)
+_HUNGARIAN_SUFFIX_TABLE = _table(HUNGARIAN_SUFFIXES)
+_TEAM_TABLE = _table(TEAM_TEMPLATES)
+
+
+@lru_cache(maxsize=None)
+def _faker(locale: str) -> Faker:
+    # egy Faker példány locale-onként, csak ha tényleg kell
+    return Faker(locale=locale)
+
+
+class _NameTable:
+    """
+    Male first / last name pools of a Faker locale for batched sampling.
+
+    Reads the person provider's name tuples (or weighted dicts) once, so a
+    batch of k names is a single `random.choices` call. Locales with an
+    unusual layout fall back to calling Faker per name.
+    """
+
+    def __init__(self, locale: str):
+        self.fake = _faker(locale)
+        provider = next((p for p in self.fake.get_providers() if isinstance(p, PersonProvider)), None)
+        self.first = self._pool(provider, "first_name", "first_names")
+        self.last = self._pool(provider, "last_name", "last_names")
+
+    @staticmethod
+    def _pool(provider, method: str, attr: str):
+        # csak ha a locale az alap Faker logikát használja (nem írja felül a metódust)
+        cls = type(provider)
+        if provider is None or getattr(cls, f"{method}_male") is not getattr(PersonProvider, f"{method}_male"):
+            return None
+        if hasattr(provider, f"{attr}_male"):
+            names = getattr(provider, f"{attr}_male")
+        elif getattr(cls, method) is getattr(PersonProvider, method):
+            names = getattr(provider, attr)
         else:
-            username_suffixes = base_suffixes
+            return None
+        values = list(names)
+        if not values or not all(isinstance(v, str) for v in values):
+            return None
+        if isinstance(names, dict):
+            return values, list(accumulate(names.values()))
+        return values, None
+
+    def _sample(self, pool, fallback, k: int, rng) -> List[str]:
+        if pool is None:
+            # a Faker saját generátora is a mi streamünkből kap seedet
+            self.fake.seed_instance(rng.getrandbits(64))
+            return [fallback() for _ in range(k)]
+        values, cum_weights = pool
+        return rng.choices(values, cum_weights=cum_weights, k=k)
+
+    def first_names(self, k: int, rng=random) -> List[str]:
+        return self._sample(self.first, self.fake.first_name_male, k, rng)
+
+    def last_names(self, k: int, rng=random) -> List[str]:
+        return self._sample(self.last, self.fake.last_name_male, k, rng)
+
 
-        username = f"{random.choice([fn, ln])}_{random.choice(username_suffixes)}"
+@lru_cache(maxsize=None)
+def _names(locale: str) -> _NameTable:
+    return _NameTable(locale)
 
-        # team generálás
-        team_suffixes = ["SIM RACING", "ESPORT", "RACING", "Motorsport", "Racing Team"]
-        teamnames = ["TEAM REDLINE", "APEX HUNTERS", "Low Fuel Motorsport", "PetrolHead Simracing"]
-        hungarian_teams = ["PEC", "GPSE", "SMC", "GTR-Masters"]
-        team_name = random.choice([ln, fn, country])
+
+def _user_ids(n: int, rng=random) -> Iterator[int]:
+    """
+    n distinct user_ids without a `used` set: an affine permutation
+    i -> (a*i + b) mod N of the ID range, with a coprime to N.
+    """
+    size = USER_ID_MAX - USER_ID_MIN + 1
+    if n > size:
+        raise ValueError(f"Cannot generate {n} unique user_ids from a range of {size}")
+    a = rng.randrange(1, size)
+    while gcd(a, size) != 1:
+        a = rng.randrange(1, size)
+    b = rng.randrange(size)
+    for i in range(n):
+        yield USER_ID_MIN + (a * i + b) % size
+
+
+def _batch(countries: Sequence[str], locale_map: Dict[str, str], user_ids: Iterator[int], rng) -> List[Player]:
+    k = len(countries)
+
+    # nevek országonként egy-egy húzással
+    by_country: Dict[str, List[int]] = {}
+    for i, country in enumerate(countries):
+        by_country.setdefault(country, []).append(i)
+    first: List[str] = [""] * k
+    last: List[str] = [""] * k
+    hungarian: List[int] = []
+    for country, idx in by_country.items():
+        table = _names(locale_map[country])
+        for i, fn, ln in zip(idx, table.first_names(len(idx), rng), table.last_names(len(idx), rng)):
+            first[i], last[i] = fn, ln
         if country == "Hungary":
-            team = random.choice(["PRIVATEER"]*40+[hungarian_teams]*45+[teamnames]*10+[f"TEAM {random.choice([fn, ln, country]).upper()}"])
-        team = random.choice(
-            ["PRIVATEER"] * 50
-            + [random.choice(teamnames)] * 45
-            + [f"TEAM {team_name.upper()}", f"{team_name.upper()} {random.choice(team_suffixes)}"] * 5
-        )
-
-        # egyedi user_id
-        user_id = random.randint(10000000, 99999999)
-        while user_id in used_ids:
-            user_id = random.randint(10000000, 99999999)
-        used_ids.add(user_id)
-
-        player = Player(user_id, username, full_name, country, team)
-        players.append(player)
+            hungarian = idx
 
+    suffixes = rng.choices(_BASE_SUFFIX_TABLE[0], cum_weights=_BASE_SUFFIX_TABLE[1], k=k)
+    for i, suffix in zip(hungarian, rng.choices(
+            _HUNGARIAN_SUFFIX_TABLE[0], cum_weights=_HUNGARIAN_SUFFIX_TABLE[1], k=len(hungarian))):
+        suffixes[i] = suffix
+    teams = rng.choices(_TEAM_TABLE[0], cum_weights=_TEAM_TABLE[1], k=k)
+
+    players = []
+    for i, country in enumerate(countries):
+        fn, ln = first[i], last[i]
+        username = f"{fn if rng.random() < 0.5 else ln}_{suffixes[i]}"
+
+        team = teams[i]
+        if "{" in team:
+            team = team.format(name=rng.choice([ln, fn, country]).upper(), suffix=rng.choice(TEAM_SUFFIXES))
+
+        players.append(Player(next(user_ids), username, f"{fn} {ln}", country, team))
     return players
+
+
+def iter_players(n: int, batch_size: int = PLAYER_BATCH_SIZE, rng=random) -> Iterator[Player]:
+    """
+    Generate n players lazily, `batch_size` at a time.
+
+    Faker instances are created on first use per locale and reused; names,
+    username suffixes and teams are drawn in batches from precomputed
+    weighted tables, and user_ids come from a permutation of the ID range
+    (unique without bookkeeping), so memory stays flat for any roster size.
+
+    Args:
+        n (int): Number of players.
+        batch_size (int): Players generated per batch.
+        rng (random.Random, optional): Random source (default: the global
+            `random` module), e.g. `RunSeeds.python("players")`.
+
+    Returns:
+        Iterator[Player]: The players.
+    """
+    locale_map = get_catalog().locale_map
+    countries = list(locale_map.keys())
+    user_ids = _user_ids(n, rng)
+
+    for start in range(0, n, batch_size):
+        k = min(batch_size, n - start)
+        yield from _batch(rng.choices(countries, k=k), locale_map, user_ids, rng)
+
+
+def generate_players(n: int, rng=random) -> List[Player]:
+    return list(iter_players(n, rng=rng))
@@ -1,64 +1,137 @@
 #generators/race_data_generator.py:
 
-import json
 import random
 import string
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime, time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from data.basic.catalog import get_catalog
 from data.basic.model_classes import Race_Data
 
 START_DATE = datetime(2025, 11, 24, 14, 0, 0)
 END_DATE = datetime(2025, 11, 30, 23, 59, 59)
 
-def _random_start_time() -> int:
+# napi versenyablakok (UTC): 14:00-tól másnap 01:30-ig; ha a vége korábbi, átnyúlik éjfélen
+SESSION_WINDOWS: List[Tuple[time, time]] = [(time(14, 0), time(1, 30))]
+SLOT_MINUTES = 15
+JITTER_MINUTES = 2
+
+# race_id: 6 jegyű base62
+RACE_ID_CHARS = string.ascii_letters + string.digits
+RACE_ID_LENGTH = 6
+
+
+def _default_rng() -> np.random.Generator:
+    # a globális random-ból seedelünk, így random.seed() ezt a generátort is rögzíti
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _race_ids(n: int, rng: np.random.Generator) -> np.ndarray:
     """
-    Generál egy random időpontot 2025-11-24 14:00 és 2025-11-30 01:30 között.
-    Az eredmény UNIX epoch ms formátumban.
+    n distinct base62 race_ids: an affine permutation i -> (a*i + b) mod 62^6
+    (a coprime to 62^6, i.e. odd and not divisible by 31), then base62 digits.
     """
-    # nap kiválasztása
-    day_offset = random.randint(0, (END_DATE - START_DATE).days)
-    day = START_DATE + timedelta(days=day_offset)
+    size = len(RACE_ID_CHARS) ** RACE_ID_LENGTH
+    if n > size:
+        raise ValueError(f"Cannot generate {n} unique race_ids from a range of {size}")
+    a = int(rng.integers(1, size))
+    while a % 2 == 0 or a % 31 == 0:
+        a = int(rng.integers(1, size))
+    b = int(rng.integers(0, size))
+    # (a*i + b) mod size int64-ben: a-t 16 bites részekre bontva nem csordul túl
+    i = np.arange(n, dtype=np.int64)
+    a_hi, a_lo = divmod(a, 1 << 16)
+    values = ((i * a_hi % size) * (1 << 16) + i * a_lo + b) % size
 
-    # időablak: 14:00-tól másnap 01:30-ig
-    window_start = day.replace(hour=14, minute=0, second=0, microsecond=0)
-    window_end = (day + timedelta(days=1)).replace(hour=1, minute=30, second=0, microsecond=0)
+    digits = np.empty((n, RACE_ID_LENGTH), dtype=np.int64)
+    for pos in range(RACE_ID_LENGTH - 1, -1, -1):
+        values, digits[:, pos] = np.divmod(values, len(RACE_ID_CHARS))
+    chars = np.array(list(RACE_ID_CHARS))[digits]
+    return np.ascontiguousarray(chars).view(f"<U{RACE_ID_LENGTH}").ravel()
 
-    total_minutes = int((window_end - window_start).total_seconds() // 60)
 
-    # válasszunk egy 15 perces slotot, kis zajjal
-    slot_index = random.randint(0, total_minutes // 15)
-    base_minute = slot_index * 15
-    jitter = random.randint(-2, 2)
-    minute_offset = max(0, min(total_minutes, base_minute + jitter))
-    second_offset = random.randint(0, 59)
+def _timestamps(
+    n: int,
+    start: datetime,
+    end: datetime,
+    windows: Sequence[Tuple[time, time]],
+    rng: np.random.Generator
+) -> np.ndarray:
+    # ablakok hossza percben (éjfélen átnyúló ablak: +1 nap)
+    offsets = np.array([_minutes(ws) for ws, _ in windows])
+    lengths = np.array([(_minutes(we) - _minutes(ws)) % (24 * 60) for ws, we in windows])
+    days = (end.date() - start.date()).days + 1
+    first_day = int(np.datetime64(start.date(), "s").astype(np.int64))
 
-    dt = window_start + timedelta(minutes=minute_offset, seconds=second_offset)
-    return int(dt.timestamp() * 1000)  # UNIX epoch ms
+    # nap és ablak (az ablak hosszával arányosan), majd 15 perces slot kis zajjal
+    day = rng.integers(0, days, n)
+    window = rng.choice(len(windows), n, p=lengths / lengths.sum())
+    length = lengths[window]
+    slot = rng.integers(0, length // SLOT_MINUTES + 1)
+    jitter = rng.integers(-JITTER_MINUTES, JITTER_MINUTES + 1, n)
+    minute = np.clip(slot * SLOT_MINUTES + jitter, 0, length)
+    second = rng.integers(0, 60, n)
 
+    seconds = first_day + day * 86400 + (offsets[window] + minute) * 60 + second
+    return seconds * 1000  # UNIX epoch ms
 
-def generate_race_data(n: int) -> List[Race_Data]:
-    RDS: List[Race_Data] = []
-    with open("data/raw/cars.json", "r", encoding="utf-8") as f:
-        cars = json.load(f)
-    with open("data/raw/tracks.json", "r", encoding="utf-8") as f:
-        tracks = json.load(f)
 
-    used_ids = set()
+def generate_race_calendar(
+    n: int,
+    start: datetime = START_DATE,
+    end: datetime = END_DATE,
+    windows: Sequence[Tuple[time, time]] = SESSION_WINDOWS,
+    rng: Optional[np.random.Generator] = None
+) -> List[Race_Data]:
+    """
+    Generate n races between `start` and `end` (any length), already sorted
+    by timestamp.
+
+    Every race falls on a day of the range, inside one of the daily session
+    windows (picked proportionally to their length), on a 15 minute slot with
+    +-2 minutes of jitter and random seconds. Times, tracks and classes are
+    drawn as NumPy arrays in one go; race_ids are distinct base62 strings.
+
+    Args:
+        n (int): Number of races.
+        start (datetime): First day of the calendar (date part is used).
+        end (datetime): Last day of the calendar (date part is used).
+        windows (Sequence[Tuple[time, time]]): Daily (start, end) session
+            windows in UTC; an end before the start runs past midnight.
+        rng (np.random.Generator, optional): Random source; seeded from the
+            global `random` module if omitted.
+
+    Returns:
+        List[Race_Data]: Races in timestamp order.
+    """
+    rng = rng or _default_rng()
+    catalog = get_catalog()
+    car_classes = list(catalog.cars.keys())
+    tracks = list(catalog.tracks.keys())
 
-    for _ in range(n):
-        # race_id generálás
-        chars = string.ascii_letters + string.digits
-        race_id = ''.join(random.choice(chars) for _ in range(6))
-        while race_id in used_ids:
-            race_id = ''.join(random.choice(chars) for _ in range(6))
-        used_ids.add(race_id)
+    # a többi mező független az időtől: elég az időpontokat rendezni
+    timestamps = np.sort(_timestamps(n, start, end, windows, rng))
+    race_ids = _race_ids(n, rng)
 
-        car_class = random.choice(list(cars.keys()))
-        track = random.choice(list(tracks.keys()))
-        layout = random.choice(tracks[track])["layout"]
+    class_idx = rng.integers(0, len(car_classes), n)
+    track_idx = rng.integers(0, len(tracks), n)
+    # layout: egyenletesen a pálya saját layoutjai közül
+    layout_counts = np.array([len(catalog.tracks[t]) for t in tracks])
+    layout_idx = (rng.random(n) * layout_counts[track_idx]).astype(np.int64)
 
-        timestamp = _random_start_time()
+    return [
+        Race_Data(race_id, tracks[t], catalog.tracks[tracks[t]][li]["layout"], car_classes[c], ts)
+        for race_id, t, li, c, ts in zip(
+            race_ids.tolist(), track_idx.tolist(), layout_idx.tolist(), class_idx.tolist(), timestamps.tolist()
+        )
+    ]
 
-        RDS.append(Race_Data(race_id, track, layout, car_class, timestamp))
 
-    return RDS
+def generate_race_data(n: int, rng: Optional[np.random.Generator] = None) -> List[Race_Data]:
+    return generate_race_calendar(n, rng=rng)
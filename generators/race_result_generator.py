@@ -1,27 +1,30 @@
 #generators/race_result_generator.py:
 
-import json
 import random
-from pathlib import Path
-from typing import List, Dict, Any
-from data.basic.model_classes import Race_Data, Player, Lap, ParticipantResult, RaceResult
+from typing import List, Dict, Any, Mapping, Optional
 
-DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
+import numpy as np
 
+from data.basic.catalog import get_catalog
+from data.basic.model_classes import (
+    Race_Data, Player, Lap, LapBlock, RaceLaps, ParticipantResult, RaceResult, encode_incidents
+)
+from generators.race_timeline import RaceTimeline
+from generators.rating_engine import update_ratings_batch
+from generators.vectorized_laps import generate_laps_batch
 
-def _get_best_lap_ms(reference_laps: Dict[str, Any], rd: Race_Data) -> int:
-    layout_data = reference_laps[rd.track][rd.layout]
-    classes = layout_data["car_class"]
-    times = layout_data["best_lap_ms"]
-    idx = classes.index(rd.car_class)
-    return times[idx]
+# "python": körönkénti szimuláció, "numpy": a teljes résztvevő x kör mátrix egyben
+# (mérve, 20 autó x 30 kör: a körgenerálás 4x, tömör körökkel 14x gyorsabb; a teljes
+# generate_laps 2.8x, ill. 4.1x - Lap objektumok nélkül a pozíció/rating rész a maradék)
+ENGINES = ("python", "numpy")
 
 
 def _generate_player_laps(
     best_lap_ms: int,
     player: Player,
     n_laps: int,
-    incidents_data: Dict[str, Dict[str, int]]
+    incidents_data: Mapping[str, Mapping[str, int]],
+    rng=random
 ) -> Dict[str, Any]:
     laps: List[Dict[str, Any]] = []
     incident_points_total = 0
@@ -30,8 +33,8 @@ def _generate_player_laps(
         # teljesítmény effektek
         rep_effect = 1 + ((100 - player.reputation) / 2000)
         rating_effect = 1 - ((player.elo_rating - 1500) / 10000)
-        craft_effect = 1 + (random.uniform(-0.02, 0.02) / (player.race_count + 1))
-        luck = random.uniform(0.95, 1.05)
+        craft_effect = 1 + (rng.uniform(-0.02, 0.02) / (player.race_count + 1))
+        luck = rng.uniform(0.95, 1.05)
 
         base = best_lap_ms
         if lap_index == 0:
@@ -40,14 +43,14 @@ def _generate_player_laps(
         laptime = int(base * rep_effect * rating_effect * craft_effect * luck)
 
         lap_incidents: List[str] = []
-        incident_count = random.choices([0, 1, 2], weights=[70, 25, 5], k=1)[0]
+        incident_count = rng.choices([0, 1, 2], weights=[70, 25, 5], k=1)[0]
         for _ in range(incident_count):
             candidates = list(incidents_data.keys())
             if lap_index > 0 and "False Start" in candidates:
                 candidates.remove("False Start")
             if not candidates:
                 break
-            inc = random.choice(candidates)
+            inc = rng.choice(candidates)
             lap_incidents.append(inc)
             incident_points_total += incidents_data[inc]["points"]
 
@@ -66,28 +69,11 @@ def _generate_player_laps(
 
 
 def _update_ratings(participants: List[ParticipantResult], K: int = 32):
-    for i, p in enumerate(participants):
-        rating_before = p.results["rating_before"]
-        rating_change = 0.0
-        for j, opp in enumerate(participants):
-            if i == j:
-                continue
-            opp_rating = opp.results["rating_before"]
-            expected = 1 / (1 + 10 ** ((opp_rating - rating_before) / 400))
-            if p.total_time < opp.total_time:
-                actual = 1
-            elif p.total_time > opp.total_time:
-                actual = 0
-            else:
-                actual = 0.5
-            rating_change += K * (actual - expected)
-        rating_change /= (len(participants) - 1)
-        p.results["rating_change"] = round(rating_change, 3)
-        new_rating = rating_before + rating_change
-        p.new_rating = max(1000, min(2500, round(new_rating, 3)))
+    # mátrixos, átlagolt páronkénti Elo (lásd rating_engine)
+    update_ratings_batch([participants], K)
 
 
-def _update_reputation(participants: List[ParticipantResult]):
+def _update_reputation(participants: List[ParticipantResult], rng=random):
     for p in participants:
         rep_before = p.results["reputation_before"]
         rep_change = 0.0
@@ -95,19 +81,22 @@ def _update_reputation(participants: List[ParticipantResult]):
         if p.incident_points > 0:
             rep_change += round(-0.2 * p.incident_points, 3)
 
-        clean_laps = sum(1 for lap in p.laps if lap.valid)
+        if isinstance(p.laps, LapBlock):
+            clean_laps = p.laps.valid_count()
+        else:
+            clean_laps = sum(1 for lap in p.laps if lap.valid)
         rep_change += round(clean_laps * 0.05, 3)
 
         if p.incident_points == 0:
             rep_change += 5.0
 
-        rep_change += round(random.uniform(-1.0, 2.0), 3)
+        rep_change += round(rng.uniform(-1.0, 2.0), 3)
 
         p.results["reputation_change"] = rep_change
         new_rep = rep_before + rep_change
 
         if new_rep < 50:
-            new_rep = 50 + random.uniform(0, 10)
+            new_rep = 50 + rng.uniform(0, 10)
 
         p.new_rep = max(0.0, min(100.0, round(new_rep, 3)))
 
@@ -116,26 +105,70 @@ def generate_laps(
     rd: Race_Data,
     players_selected: List[Player],
     min_laps: int = 8,
-    max_laps: int = 18
+    max_laps: int = 18,
+    engine: str = "python",
+    rng: Optional[random.Random] = None,
+    compact: bool = False,
+    keep_timeline: bool = False
 ) -> RaceResult:
-    with open(DATA_DIR / "reference_laps.json", "r", encoding="utf-8") as f:
-        reference_laps = json.load(f)
-    with open(DATA_DIR / "incidents.json", "r", encoding="utf-8") as f:
-        incidents_data = json.load(f)
-
-    best_lap_ms = _get_best_lap_ms(reference_laps, rd)
-    n_laps = random.randint(min_laps, max_laps)
-
-    random.shuffle(players_selected)
+    """
+    Simulate one race of the selected players and update their rating/reputation.
+
+    Args:
+        rd (Race_Data): The race to simulate.
+        players_selected (List[Player]): Participants (shuffled in place for the grid).
+        min_laps (int): Minimum number of laps.
+        max_laps (int): Maximum number of laps.
+        engine (str): "python" (lap by lap) or "numpy" (whole grid at once).
+        rng (random.Random, optional): Random source of this race; the global
+            `random` module when omitted.
+        compact (bool): Store the laps in one array-backed `RaceLaps` per race
+            (a `LapBlock` window per participant) instead of `Lap` lists.
+        keep_timeline (bool): Attach the `RaceTimeline` (per-lap gaps to the
+            leader and intervals to the car ahead) as `RaceResult.timeline`;
+            off by default, it takes about as much memory as compact laps.
+
+    Returns:
+        RaceResult: Result with per-lap positions, finish order and rating changes.
+    """
+    rng = rng or random
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown lap engine: {engine!r} (expected one of {ENGINES})")
+
+    catalog = get_catalog()
+    incidents_data = catalog.incidents
+
+    best_lap_ms = catalog.best_lap_ms(rd)
+    n_laps = rng.randint(min_laps, max_laps)
+
+    rng.shuffle(players_selected)
+
+    if engine == "numpy":
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        laps_packs = generate_laps_batch(best_lap_ms, players_selected, n_laps, incidents_data, np_rng, compact)
+    else:
+        laps_packs = []
+        race_laps = RaceLaps() if compact else None
+        for p in players_selected:
+            laps_pack = _generate_player_laps(best_lap_ms, p, n_laps, incidents_data, rng)
+            laps = laps_pack["laps"]
+            if compact:
+                # a kör-dictekből egyenesen a verseny oszlopaiba, Lap objektumok nélkül
+                laps_pack["laps"] = race_laps.add(
+                    [lap["time"] for lap in laps],
+                    [lap["valid"] for lap in laps],
+                    [encode_incidents(lap["incidents"]) if lap["incidents"] else 0 for lap in laps]
+                )
+            else:
+                laps_pack["laps"] = [Lap(**lap) for lap in laps]
+            laps_packs.append(laps_pack)
 
     participants: List[ParticipantResult] = []
-    for start_pos, p in enumerate(players_selected, start=1):
-        laps_pack = _generate_player_laps(best_lap_ms, p, n_laps, incidents_data)
-
+    for start_pos, (p, laps_pack) in enumerate(zip(players_selected, laps_packs), start=1):
         rating_before = p.elo_rating
         rep_before = p.reputation
 
-        laps_objs = [Lap(**lap) for lap in laps_pack["laps"]]
+        laps_objs = laps_pack["laps"]
 
         participants.append(
             ParticipantResult(
@@ -155,19 +188,17 @@ def generate_laps(
             )
         )
 
-    # --- dinamikus pozíció frissítés körönként ---
-    for lap_index in range(n_laps):
-        participants.sort(key=lambda x: sum(l.time for l in x.laps[:lap_index+1]))
-        for pos, part in enumerate(participants, start=1):
-            part.laps[lap_index].position = pos
+    # --- dinamikus pozíció frissítés körönként (kumulált idők alapján) ---
+    timeline = RaceTimeline.from_participants(participants)
+    timeline.apply_positions(participants)
 
     # végső sorrend a teljes idő alapján
-    participants.sort(key=lambda x: x.total_time)
+    participants = [participants[i] for i in timeline.finish_order()]
     for final_pos, part in enumerate(participants, start=1):
         part.finish_position = final_pos
 
     _update_ratings(participants)
-    _update_reputation(participants)
+    _update_reputation(participants, rng)
 
     for part in participants:
         player = next(p for p in players_selected if p.USER_ID == part.user_id)
@@ -181,5 +212,7 @@ def generate_laps(
         layout=rd.layout,
         car_class=rd.car_class,
         timestamp=rd.timestamp,   # fontos: UNIX epoch ms
-        participants=participants
+        participants=participants,
+        # a timeline sorai rajtsorrendben: egy résztvevő sora start_position - 1
+        timeline=timeline if keep_timeline else None
     )
@@ -0,0 +1,79 @@
+#generators/race_timeline.py:
+
+from typing import List, Sequence
+
+import numpy as np
+
+from data.basic.model_classes import LapBlock, ParticipantResult
+
+
+class RaceTimeline:
+    """
+    Running order of a race, lap by lap.
+
+    Built from a participants x laps matrix of lap times with a single
+    cumulative pass; the order after each lap is one stable argsort of that
+    lap's cumulative times, starting from the previous lap's order (the grid
+    order before lap 1), so ties keep the car that was ahead in front.
+
+    Attributes:
+        cumulative (np.ndarray): (participants, laps) cumulative race time, ms.
+        order (np.ndarray): (laps, participants) participant indices in running
+            order after each lap.
+        positions (np.ndarray): (participants, laps) 1-based positions.
+        gaps (np.ndarray): (participants, laps) gap to the leader, ms.
+        intervals (np.ndarray): (participants, laps) gap to the car directly
+            ahead, ms (0 for the leader).
+    """
+
+    def __init__(self, lap_times: np.ndarray):
+        lap_times = np.asarray(lap_times, dtype=np.int64)
+        n_participants, n_laps = lap_times.shape
+
+        self.cumulative = np.cumsum(lap_times, axis=1)
+        self.order = np.empty((n_laps, n_participants), dtype=np.int64)
+
+        # körönként csak a stabil argsort sorrendfüggő, a többi egyben számolható
+        lap_cum = self.cumulative.T
+        running = np.arange(n_participants)
+        for lap_index in range(n_laps):
+            running = running[np.argsort(lap_cum[lap_index, running], kind="stable")]
+            self.order[lap_index] = running
+
+        # (laps, participants) sorrendben rendezett kumulált idők, majd vissza résztvevő x kör alakba
+        sorted_cum = np.take_along_axis(lap_cum, self.order, axis=1)
+        laps = np.arange(n_laps)[:, None]
+        self.positions = np.empty((n_participants, n_laps), dtype=np.int64)
+        self.gaps = np.empty((n_participants, n_laps), dtype=np.int64)
+        self.intervals = np.empty((n_participants, n_laps), dtype=np.int64)
+        self.positions[self.order, laps] = np.arange(1, n_participants + 1)
+        self.gaps[self.order, laps] = sorted_cum - sorted_cum[:, :1]
+        self.intervals[self.order, laps] = np.diff(sorted_cum, axis=1, prepend=sorted_cum[:, :1])
+
+        self._final_order = running
+
+    @classmethod
+    def from_participants(cls, participants: Sequence[ParticipantResult]) -> "RaceTimeline":
+        """Build the timeline from the participants' lap times (list order = grid order)."""
+        lap_times = [p.laps.times if isinstance(p.laps, LapBlock) else [lap.time for lap in p.laps]
+                     for p in participants]
+        if not lap_times:
+            return cls(np.empty((0, 0), dtype=np.int64))
+        return cls(np.array(lap_times, dtype=np.int64))
+
+    @property
+    def n_laps(self) -> int:
+        return self.cumulative.shape[1]
+
+    def finish_order(self) -> List[int]:
+        """Participant indices in finishing order (running order after the last lap)."""
+        return self._final_order.tolist()
+
+    def apply_positions(self, participants: Sequence[ParticipantResult]) -> None:
+        """Write the per-lap positions into `Lap.position` of each participant."""
+        for part, row in zip(participants, self.positions.tolist()):
+            if isinstance(part.laps, LapBlock):
+                part.laps.set_positions(row)
+                continue
+            for lap, pos in zip(part.laps, row):
+                lap.position = pos
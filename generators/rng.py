@@ -0,0 +1,50 @@
+#generators/rng.py:
+
+import random
+from typing import Optional, Union
+
+import numpy as np
+
+# független véletlen-streamek (a spawn_key első eleme)
+STREAMS = {"players": 0, "calendar": 1, "schedule": 2, "race": 3}
+
+
+def _key(part: Union[int, str]) -> int:
+    # race_id (base62 string) -> nemnegatív egész a spawn_key-hez
+    return part if isinstance(part, int) else int.from_bytes(part.encode("utf-8"), "big")
+
+
+class RunSeeds:
+    """
+    Seed tree of one generation run.
+
+    A root seed (given, or fresh entropy that can be read back from `seed`)
+    and independent child streams derived from it with NumPy's
+    `SeedSequence` spawn keys: one per generator stage (players, calendar,
+    schedule) and one per race, keyed by race_id. A stream depends only on
+    the root seed and its key, never on how many numbers other stages drew
+    or in which order races ran, so the same seed reproduces the run with
+    any number of workers.
+
+    Usage:
+        seeds = RunSeeds(42)
+        players = generate_players(32, rng=seeds.python("players"))
+        rng = seeds.python("race", race.RACE_ID)
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.root = np.random.SeedSequence(seed)
+        self.seed: int = self.root.entropy
+
+    def sequence(self, stream: str, *key: Union[int, str]) -> np.random.SeedSequence:
+        return np.random.SeedSequence(self.root.entropy, spawn_key=(STREAMS[stream], *map(_key, key)))
+
+    def seed_int(self, stream: str, *key: Union[int, str]) -> int:
+        """64 bit seed of a child stream (e.g. for `random.Random`)."""
+        return int(self.sequence(stream, *key).generate_state(1, np.uint64)[0])
+
+    def numpy(self, stream: str, *key: Union[int, str]) -> np.random.Generator:
+        return np.random.default_rng(self.sequence(stream, *key))
+
+    def python(self, stream: str, *key: Union[int, str]) -> random.Random:
+        return random.Random(self.seed_int(stream, *key))
@@ -0,0 +1,190 @@
+#generators/season_simulator.py:
+
+import random
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from data.basic.catalog import get_catalog
+from data.basic.model_classes import Player, Race_Data, RaceResult
+from generators.availability import AvailabilityIndex
+from generators.race_result_generator import generate_laps
+from generators.rng import RunSeeds
+
+# (user_id, elo_rating, reputation, race_count) egy verseny után
+PlayerState = Tuple[int, float, float, int]
+
+
+@dataclass
+class ScheduledRace:
+    index: int
+    race: Race_Data
+    participant_ids: List[int]
+    seed: int
+
+
+def schedule_season(
+    players: List[Player],
+    races: List[Race_Data],
+    participants_per_race: int = 3,
+    seeds: Optional[RunSeeds] = None
+) -> List[ScheduledRace]:
+    """
+    Assign participants to the (timestamp-sorted) races.
+
+    A player is free for a race once the estimated end of their previous race
+    has passed (tracked by an `AvailabilityIndex`); races without enough free
+    players are skipped. Every scheduled race also gets its own seed, so its
+    simulation does not depend on the order in which races are executed.
+    With `seeds`, the draws come from its "schedule" stream and the race seed
+    is derived from the race_id, so a race keeps its seed even if the races
+    before it change.
+
+    Args:
+        players (List[Player]): The player pool.
+        races (List[Race_Data]): Races sorted by timestamp.
+        participants_per_race (int): Grid size.
+        seeds (RunSeeds, optional): Seed tree of the run (default: global `random`).
+
+    Returns:
+        List[ScheduledRace]: Scheduled races in timestamp order.
+    """
+    catalog = get_catalog()
+    availability = AvailabilityIndex(players)
+    schedule: List[ScheduledRace] = []
+    rng = seeds.python("schedule") if seeds is not None else random
+
+    for rd in races:
+        start_ts = rd.timestamp
+        end_ts = start_ts + catalog.estimated_duration_ms(rd)
+
+        # szabad játékosok közül sorsolunk
+        participants = availability.acquire(participants_per_race, start_ts, rng)
+        if participants is None:
+            continue  # kihagyjuk, ha nincs elég szabad játékos
+        availability.occupy(participants, end_ts)
+
+        schedule.append(ScheduledRace(
+            index=len(schedule),
+            race=rd,
+            participant_ids=[p.USER_ID for p in participants],
+            seed=seeds.seed_int("race", rd.RACE_ID) if seeds is not None else random.getrandbits(64)
+        ))
+
+    return schedule
+
+
+def build_dependencies(schedule: Sequence[ScheduledRace]) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Race -> race dependency DAG: a race depends on the previous race of each of
+    its participants (ratings, reputation and race count flow through them).
+
+    Returns:
+        Tuple[List[List[int]], List[List[int]]]: (predecessors, dependents) per
+        schedule index.
+    """
+    predecessors: List[List[int]] = [[] for _ in schedule]
+    dependents: List[List[int]] = [[] for _ in schedule]
+    last_race_of: Dict[int, int] = {}
+
+    for sr in schedule:
+        preds = {last_race_of[uid] for uid in sr.participant_ids if uid in last_race_of}
+        predecessors[sr.index] = sorted(preds)
+        for pred in preds:
+            dependents[pred].append(sr.index)
+        for uid in sr.participant_ids:
+            last_race_of[uid] = sr.index
+
+    return predecessors, dependents
+
+
+def _simulate_race(
+    sr: ScheduledRace,
+    participants: List[Player],
+    min_laps: int,
+    max_laps: int,
+    engine: str,
+    compact: bool,
+    keep_timeline: bool
+) -> Tuple[RaceResult, List[PlayerState]]:
+    rr = generate_laps(sr.race, participants, min_laps=min_laps, max_laps=max_laps,
+                       engine=engine, rng=random.Random(sr.seed), compact=compact,
+                       keep_timeline=keep_timeline)
+    states = [(p.USER_ID, p.elo_rating, p.reputation, p.race_count) for p in participants]
+    return rr, states
+
+
+def simulate_season(
+    players: List[Player],
+    schedule: Sequence[ScheduledRace],
+    min_laps: int = 8,
+    max_laps: int = 18,
+    engine: str = "python",
+    workers: int = 1,
+    compact: bool = False,
+    keep_timeline: bool = False
+) -> Iterator[RaceResult]:
+    """
+    Simulate the scheduled races and yield the results in schedule order.
+
+    With workers > 1, races whose participants do not conflict run concurrently
+    on a process pool: a race is submitted as soon as all its predecessors in
+    the dependency DAG are done, and the returned player states are merged
+    back into `players`. Since every race uses its own seed, the results are
+    identical to the sequential run.
+
+    Args:
+        players (List[Player]): Player pool, updated in place.
+        schedule (Sequence[ScheduledRace]): Output of `schedule_season`.
+        min_laps (int): Minimum number of laps.
+        max_laps (int): Maximum number of laps.
+        engine (str): Lap engine of `generate_laps`.
+        workers (int): Number of worker processes (1 = sequential).
+        compact (bool): Store laps in one array-backed `RaceLaps` per race.
+        keep_timeline (bool): Attach each race's `RaceTimeline` (gaps / intervals).
+
+    Yields:
+        RaceResult: Results in timestamp order.
+    """
+    by_id: Dict[int, Player] = {p.USER_ID: p for p in players}
+
+    if workers <= 1:
+        for sr in schedule:
+            participants = [by_id[uid] for uid in sr.participant_ids]
+            rr, _ = _simulate_race(sr, participants, min_laps, max_laps, engine, compact, keep_timeline)
+            yield rr
+        return
+
+    predecessors, dependents = build_dependencies(schedule)
+    pending = [len(preds) for preds in predecessors]
+    ready = deque(i for i, n in enumerate(pending) if n == 0)
+    finished: Dict[int, RaceResult] = {}
+    next_index = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        while next_index < len(schedule):
+            while ready and len(in_flight) < workers * 2:
+                sr = schedule[ready.popleft()]
+                participants = [by_id[uid] for uid in sr.participant_ids]
+                fut = pool.submit(_simulate_race, sr, participants, min_laps, max_laps, engine, compact,
+                                  keep_timeline)
+                in_flight[fut] = sr.index
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                index = in_flight.pop(fut)
+                rr, states = fut.result()
+                for uid, elo, rep, count in states:
+                    player = by_id[uid]
+                    player.elo_rating, player.reputation, player.race_count = elo, rep, count
+                finished[index] = rr
+                for dep in dependents[index]:
+                    pending[dep] -= 1
+                    if pending[dep] == 0:
+                        ready.append(dep)
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
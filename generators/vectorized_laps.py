@@ -0,0 +1,126 @@
+#generators/vectorized_laps.py:
+
+import random
+from itertools import repeat
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from data.basic.model_classes import Player, Lap, RaceLaps, INCIDENT_BITS
+
+# körönkénti incidensszám eloszlása (ugyanaz, mint a python motorban)
+INCIDENT_COUNTS = np.array([0, 1, 2])
+INCIDENT_COUNT_P = np.array([70, 25, 5]) / 100
+FALSE_START = "False Start"
+
+
+def _default_rng() -> np.random.Generator:
+    # a globális random-ból seedelünk, így random.seed() ezt a motort is rögzíti
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def generate_laps_batch(
+    best_lap_ms: int,
+    players: List[Player],
+    n_laps: int,
+    incidents_data: Mapping[str, Mapping[str, int]],
+    rng: Optional[np.random.Generator] = None,
+    compact: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Draw the full participants x laps matrix in one go.
+
+    Same distributions as `_generate_player_laps`: uniform craft/luck factors,
+    0/1/2 incidents per lap with 70/25/5 weights, incidents picked uniformly
+    (no "False Start" after the first lap), a lap is invalid on "Track Limit".
+
+    Args:
+        best_lap_ms (int): Reference lap time of the race.
+        players (List[Player]): Participants, in start order.
+        n_laps (int): Number of laps.
+        incidents_data (Mapping): incidents.json content.
+        rng (np.random.Generator, optional): Random source; seeded from the
+            global `random` module when omitted.
+        compact (bool): Return each player's laps as a `LapBlock` window over
+            one `RaceLaps` filled straight from the arrays, instead of `Lap`
+            objects.
+
+    Returns:
+        List[Dict[str, Any]]: One laps pack per player, shaped like the return
+        value of `_generate_player_laps`, but with `Lap` objects (or a
+        `LapBlock`) in "laps".
+    """
+    rng = rng or _default_rng()
+    n_players = len(players)
+    shape = (n_players, n_laps)
+
+    reputation = np.array([p.reputation for p in players], dtype=float)[:, None]
+    elo = np.array([p.elo_rating for p in players], dtype=float)[:, None]
+    race_count = np.array([p.race_count for p in players], dtype=float)[:, None]
+
+    # teljesítmény effektek
+    rep_effect = 1 + ((100 - reputation) / 2000)
+    rating_effect = 1 - ((elo - 1500) / 10000)
+    craft_effect = 1 + (rng.uniform(-0.02, 0.02, size=shape) / (race_count + 1))
+    luck = rng.uniform(0.95, 1.05, size=shape)
+
+    base = np.full(n_laps, best_lap_ms, dtype=float)
+    base[0] = int(best_lap_ms * 1.10)
+    times = (base * rep_effect * rating_effect * craft_effect * luck).astype(np.int64)
+
+    # incidensek: max. 2 slot körönként, a darabszám maszkolja
+    names = list(incidents_data.keys())
+    points = np.array([incidents_data[n]["points"] for n in names], dtype=np.int64)
+    later_idx = np.array([i for i, n in enumerate(names) if n != FALSE_START], dtype=np.int64)
+
+    counts = rng.choice(INCIDENT_COUNTS, size=shape, p=INCIDENT_COUNT_P)
+    u = rng.random((n_players, n_laps, INCIDENT_COUNTS[-1]))
+    picks = np.empty(u.shape, dtype=np.int64)
+    picks[:, 0] = (u[:, 0] * len(names)).astype(np.int64)
+    if len(later_idx):
+        picks[:, 1:] = later_idx[(u[:, 1:] * len(later_idx)).astype(np.int64)]
+    else:
+        counts[:, 1:] = 0
+    used = np.arange(INCIDENT_COUNTS[-1]) < counts[..., None]
+
+    incident_points = np.where(used, points[picks], 0).sum(axis=(1, 2))
+    if "Track Limit" in names:
+        track_limit = names.index("Track Limit")
+        valid = ~(used & (picks == track_limit)).any(axis=2)
+    else:
+        valid = np.ones(shape, dtype=bool)
+    totals = times.sum(axis=1)
+
+    if compact:
+        # incidens-kódok: slotonként (index + 1) << 4 * slot, ahogy a LapBlock tárolja;
+        # a mátrixok sorfolytonosan, egyben kerülnek a verseny oszlopaiba
+        shifts = np.arange(INCIDENT_COUNTS[-1], dtype=np.int64) * INCIDENT_BITS
+        codes = np.where(used, (picks + 1) << shifts, 0).sum(axis=2)
+        blocks = RaceLaps().extend_from_buffers(
+            np.ascontiguousarray(times, dtype=RaceLaps.TIME_TYPECODE),
+            np.ascontiguousarray(valid, dtype=RaceLaps.VALID_TYPECODE),
+            np.ascontiguousarray(codes, dtype=RaceLaps.CODE_TYPECODE),
+            n_laps
+        )
+        return [
+            {"laps": block, "incident_points_total": points_total, "total_time": total}
+            for block, points_total, total in zip(blocks, incident_points.tolist(), totals.tolist())
+        ]
+
+    # incidens-listák: üres listák, csak ott töltjük, ahol volt incidens
+    incident_lists = [[[] for _ in range(n_laps)] for _ in range(n_players)]
+    hit_players, hit_laps = np.nonzero(counts)
+    for pi, li in zip(hit_players.tolist(), hit_laps.tolist()):
+        incident_lists[pi][li].extend(names[k] for k in picks[pi, li, :counts[pi, li]].tolist())
+
+    lap_numbers = range(1, n_laps + 1)
+    packs: List[Dict[str, Any]] = []
+    for times_row, valid_row, incidents_row, points_total, total in zip(
+        times.tolist(), valid.tolist(), incident_lists, incident_points.tolist(), totals.tolist()
+    ):
+        packs.append({
+            "laps": list(map(Lap, lap_numbers, times_row, valid_row, repeat(None), incidents_row)),
+            "incident_points_total": points_total,
+            "total_time": total
+        })
+    return packs
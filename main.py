@@ -1,149 +1,252 @@
 #/main.py:
 
 import subprocess
-import random
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Dict, List, Union
 
 from data.basic.model_classes import Player, Race_Data, RaceResult
 from functions.unix_to_datetime import unix_to_dt
 from functions.unix_to_timestamp import unix_to_ts
 from generators.player_generator import generate_players
 from generators.race_data_generator import generate_race_data
-from generators.race_result_generator import generate_laps, _get_best_lap_ms
+from generators.season_simulator import schedule_season, simulate_season
+from generators.rng import RunSeeds
 
-from data.basic.handler.json_handler import save_json
-from data.basic.handler.csv_handler import save_csv
-from data.basic.handler.xlsx_handler import save_xlsx
+from data.basic.handler.json_handler import save_json, append_jsonl
+from data.basic.handler.csv_handler import save_csv, append_race_tables
+from data.basic.handler.xlsx_handler import save_xlsx, SeasonWorkbook, pin_timestamp as pin_xlsx_timestamp
+from data.basic.handler.export_pipeline import ExportPipeline
+from data.basic.handler.summary_handler import DashboardSummary
 from functions.clear_results import clear_results
-from data.basic.handler.sql_handler import SQLHandler
+from data.basic.handler.sql_handler import SQLHandler, create_pool
+from data.basic.handler.sqlite_handler import SQLiteHandler, SQLitePool
+from data.basic.handler.parallel_loader import ParallelLoader
 
-import json
+# a futás gyökér seedje: ugyanaz a seed ugyanazt a created/ tartalmat adja
+# (worker számtól függetlenül); None = új véletlen seed, amit kiírunk
+SEED = None
+# párhuzamos szezon-szimuláció folyamatainak száma (1 = szekvenciális)
+SEASON_WORKERS = 1
+# kör-szimuláció motorja: "python" = körönként, "numpy" = a teljes résztvevő x kör mátrix
+# egyben (ugyanazok az eloszlások, de más véletlen sorozat: egy seed motoronként más szezont ad)
+LAP_ENGINE = "numpy"
+# körök tömör, tömb alapú tárolása (versenyenként egy RaceLaps, résztvevőnként LapBlock)
+# a memóriában tartott eredményekhez
+COMPACT_LAPS = True
+# versenyenkénti RaceTimeline (körönkénti gap / interval) megtartása a RaceResult-on
+# a későbbi exportokhoz; kb. annyi memória, mint maguk a tömör körök
+KEEP_TIMELINES = False
+# versenyenkénti résztvevők száma
+PARTICIPANTS_PER_RACE = 3
+# export sorok mérete (backpressure) és formátumonkénti író szálak száma
+EXPORT_QUEUE_SIZE = 64
+EXPORT_WORKERS = {"json": 1, "csv": 1, "xlsx": 2}
+# JSON versenyeredmények: "files" = race_results/<race_id>.json,
+# "jsonl" = egyetlen hozzáfűzős race_results.jsonl + byte-offset index
+RESULTS_JSON_MODE = "files"
+RESULTS_JSONL = "race_results/race_results.jsonl"
+# CSV versenyeredmények: "files" = race_results/<race_id>.csv,
+# "tables" = normalizált races.csv / participants.csv / laps.csv, versenyenként hozzáfűzve
+CSV_MODE = "files"
+CSV_TABLES_DIR = "race_results"
+# XLSX: write-only (streaming) munkafüzet named style-okkal és feltételes formázással
+XLSX_STREAMING = True
+# XLSX versenyeredmények: "files" = race_results/<race_id>.xlsx,
+# "season" = egyetlen szezon munkafüzet (Races, Participants, Laps lapok race_id kulccsal)
+XLSX_MODE = "files"
+SEASON_XLSX = "race_results/season.xlsx"
+# DB betöltés: "oracle" (.env alapján) vagy "sqlite" (helyi fájl, Oracle nélkül)
+DB_BACKEND = "oracle"
+DB_BATCH_SIZE = 5000
+# False: táblák eldobása és teljes újratöltés (alapértelmezés, minden futás új szezont generál)
+# True: inkrementális betöltés, csak a még nem tárolt race_id-k kerülnek be, a játékosok MERGE-elve
+DB_INCREMENTAL = False
+# párhuzamos DB session-ök száma (1 = egyetlen kapcsolat) és commit határ (batch-ek, None = a végén)
+# (sqlite poolon minden batch után commitol, ott egyszerre csak egy session ír)
+DB_SESSIONS = 4
+DB_COMMIT_EVERY = None
 
-DATA_DIR = Path(__file__).parent / "data" / "raw"
 
+def race_sheets(rr: RaceResult) -> Dict[str, List[Dict[str, Any]]]:
+    """Egy verseny XLSX lapjai (RaceResult, Participants, Laps) sorokként."""
+    race_meta = [{
+        "race_id": rr.race_id,
+        "track": rr.track,
+        "layout": rr.layout,
+        "car_class": rr.car_class,
+        "timestamp": unix_to_dt(rr.timestamp)
+    }]
+    participants_rows = []
+    for p in rr.participants:
+        participants_rows.append({
+            "race_id": rr.race_id,
+            "user_id": p.user_id,
+            "username": p.username,
+            "start_position": p.start_position,
+            "finish_position": p.finish_position,
+            "incident_points": p.incident_points,
+            "total_time": unix_to_ts(p.total_time),
+            "rating_before": p.results["rating_before"],
+            "rating_change": p.results["rating_change"],
+            "reputation_before": p.results["reputation_before"],
+            "reputation_change": p.results["reputation_change"],
+            "new_rating": p.new_rating,
+            "new_rep": p.new_rep
+        })
+    laps_rows = []
+    for p in rr.participants:
+        for l in p.laps:
+            laps_rows.append({
+                "race_id": rr.race_id,
+                "user_id": p.user_id,
+                "lap": l.lap,
+                "time": unix_to_ts(l.time),
+                "position": l.position,
+                "valid": l.valid,
+                "incidents": ", ".join(l.incidents) if l.incidents else ""
+            })
+
+    return {
+        "RaceResult": race_meta,
+        "Participants": participants_rows,
+        "Laps": laps_rows
+    }
+
+
+def season_sheets(rr: RaceResult) -> Dict[str, List[Dict[str, Any]]]:
+    """A szezon munkafüzet lapjai: ugyanazok a sorok, mint a versenyenkénti fájlokban."""
+    sheets = race_sheets(rr)
+    return {
+        "Races": sheets["RaceResult"],
+        "Participants": sheets["Participants"],
+        "Laps": sheets["Laps"]
+    }
 
-def estimate_race_duration_ms(rd: Race_Data) -> int:
-    """Becsült versenyidő a referencia köridő alapján."""
-    with open(DATA_DIR / "reference_laps.json", "r", encoding="utf-8") as f:
-        reference_laps = json.load(f)
-    best_lap_ms = _get_best_lap_ms(reference_laps, rd)
-    # 1. kör 1.10x, többi 1.05x, átlagosan 8 kör
-    estimated_laps = 8
-    total = int(best_lap_ms * 1.10) + int(best_lap_ms * 1.05) * (estimated_laps - 1)
-    return total
+
+def export_json(rr: RaceResult) -> Path:
+    if RESULTS_JSON_MODE == "jsonl":
+        return append_jsonl([rr], RESULTS_JSONL, key="race_id")
+    return save_json([rr], f"race_results/{rr.race_id}.json")
+
+
+def export_csv(rr: RaceResult) -> Union[Path, List[Path]]:
+    if CSV_MODE == "tables":
+        return append_race_tables([rr], CSV_TABLES_DIR)
+    return save_csv([rr], f"race_results/{rr.race_id}.csv")
+
+
+def export_xlsx(rr: RaceResult) -> Path:
+    return save_xlsx(race_sheets(rr), f"race_results/{rr.race_id}.xlsx", streaming=XLSX_STREAMING)
 
 
 def main():
     clear_results()
     Path("race_results").mkdir(parents=True, exist_ok=True)
 
+    # független véletlen-streamek stage-enként és versenyenként (race_id)
+    seeds = RunSeeds(SEED)
+    print("Seed:", seeds.seed)
+
     # generálandó játékosok száma
-    PLAYERS: List[Player] = generate_players(32)
-    # generálandó versenyek száma,
-    RACES: List[Race_Data] = generate_race_data(231)
+    PLAYERS: List[Player] = generate_players(32, rng=seeds.python("players"))
+    # generálandó versenyek száma (már idő szerint rendezve)
+    RACES: List[Race_Data] = generate_race_data(231, rng=seeds.numpy("calendar"))
+    # xlsx metaadat idő: az utolsó verseny ideje (a seedből jön), így az xlsx fájlok is reprodukálhatók
+    pin_xlsx_timestamp(datetime.fromtimestamp(RACES[-1].timestamp / 1000, timezone.utc).replace(tzinfo=None))
     race_results: List[RaceResult] = []
 
-    # játékosok utolsó elérhetősége
-    last_available: Dict[int, int] = {p.USER_ID: 0 for p in PLAYERS}
+    # résztvevők kiosztása az elérhetőség alapján, majd szimuláció
+    schedule = schedule_season(PLAYERS, RACES, participants_per_race=PARTICIPANTS_PER_RACE, seeds=seeds)
 
-    # idő szerint rendezett versenyek
-    RACES.sort(key=lambda r: r.timestamp)
+    # szezon munkafüzet: egyetlen író szál, így a sorok időrendben kerülnek be
+    season_xlsx = None
+    xlsx_writer = export_xlsx
+    export_workers = dict(EXPORT_WORKERS)
+    if XLSX_MODE == "season":
+        season_xlsx = SeasonWorkbook(SEASON_XLSX, ("Races", "Participants", "Laps"))
+        xlsx_writer = lambda rr: season_xlsx.append(season_sheets(rr))
+        export_workers["xlsx"] = 1
+    # hozzáfűzős formátumok: egy író szál, így a sorrend (és a fájl) determinisztikus
+    if CSV_MODE == "tables":
+        export_workers["csv"] = 1
+    if RESULTS_JSON_MODE == "jsonl":
+        export_workers["json"] = 1
 
-    for rd in RACES:
-        start_ts = rd.timestamp
-        est_duration = estimate_race_duration_ms(rd)
-        end_ts = start_ts + est_duration
-
-        # szabad játékosok
-        available = [p for p in PLAYERS if last_available[p.USER_ID] <= start_ts]
-        if len(available) < 3:
-            continue  # kihagyjuk, ha nincs elég szabad játékos
-
-        num_participants = min(3, len(available))
-        participants = random.sample(available, num_participants)
+    # előre számolt dashboard adatok (participations, karrier, ranglista)
+    summary = DashboardSummary()
 
+    # per-race export háttérszálakon, a szimulációval átfedésben
+    exports = ExportPipeline(
+        {"json": export_json, "csv": export_csv, "xlsx": xlsx_writer},
+        queue_size=EXPORT_QUEUE_SIZE,
+        workers=export_workers
+    )
+    # a munkafüzet az exportok után zár (a with fordított sorrendben lép ki); hibánál nem mentjük
+    with season_xlsx if season_xlsx is not None else nullcontext(), exports:
         # generálandó minimum, maximum körök száma
-        rr: RaceResult = generate_laps(rd, participants, min_laps=3, max_laps=15)
-        race_results.append(rr)
-
-        # frissítjük a játékosok elérhetőségét
-        for p in participants:
-            last_available[p.USER_ID] = end_ts
-
-        # per-race export
-        save_json([rr], f"race_results/{rr.race_id}.json")
-        save_csv([rr], f"race_results/{rr.race_id}.csv")
-
-        race_meta = [{
-            "race_id": rr.race_id,
-            "track": rr.track,
-            "layout": rr.layout,
-            "car_class": rr.car_class,
-            "timestamp": unix_to_dt(rr.timestamp)
-        }]
-        participants_rows = []
-        for p in rr.participants:
-            participants_rows.append({
-                "race_id": rr.race_id,
-                "user_id": p.user_id,
-                "username": p.username,
-                "start_position": p.start_position,
-                "finish_position": p.finish_position,
-                "incident_points": p.incident_points,
-                "total_time": unix_to_ts(p.total_time),
-                "rating_before": p.results["rating_before"],
-                "rating_change": p.results["rating_change"],
-                "reputation_before": p.results["reputation_before"],
-                "reputation_change": p.results["reputation_change"],
-                "new_rating": p.new_rating,
-                "new_rep": p.new_rep
-            })
-        laps_rows = []
-        for p in rr.participants:
-            for l in p.laps:
-                laps_rows.append({
-                    "race_id": rr.race_id,
-                    "user_id": p.user_id,
-                    "lap": l.lap,
-                    "time": unix_to_ts(l.time),
-                    "position": l.position,
-                    "valid": l.valid,
-                    "incidents": ", ".join(l.incidents) if l.incidents else ""
-                })
-
-        save_xlsx({
-            "RaceResult": race_meta,
-            "Participants": participants_rows,
-            "Laps": laps_rows
-        }, f"race_results/{rr.race_id}.xlsx")
+        for rr in simulate_season(PLAYERS, schedule, min_laps=3, max_laps=15,
+                                  engine=LAP_ENGINE, workers=SEASON_WORKERS, compact=COMPACT_LAPS,
+                                  keep_timeline=KEEP_TIMELINES):
+            race_results.append(rr)
+            summary.add_race(rr)
+            exports.submit(rr)
+    # innen minden versenyfájl lemezen van (az exportok flush + fsync, a szezon munkafüzet close-ja szintén)
 
     # global exports
     save_json(PLAYERS, "players.json")
     save_json(RACES, "race_meta.json")
     save_csv(PLAYERS, "players.csv")
     save_csv(RACES, "race_meta.csv")
-    save_xlsx({"Players": PLAYERS}, "players.xlsx")
-    save_xlsx({"Races": RACES}, "race_meta.xlsx")
+    save_xlsx({"Players": PLAYERS}, "players.xlsx", streaming=XLSX_STREAMING)
+    save_xlsx({"Races": RACES}, "race_meta.xlsx", streaming=XLSX_STREAMING)
+    summary.set_players(PLAYERS)
+    summary.save()
 
     # DB betöltés (opcionális)
     load_db = False
     if load_db:
-        handler = SQLHandler()
-        handler.connect()
-        handler.clear_tables()
-        handler.create_schema()
-        handler.insert_players(PLAYERS)
-        handler.insert_races(RACES)
-        handler.insert_results(race_results)
-        handler.commit()
+        # több session: pool + párhuzamos betöltés, egy session: egyetlen kapcsolat
+        pool = None
+        if DB_SESSIONS > 1:
+            pool = SQLitePool(sessions=DB_SESSIONS) if DB_BACKEND == "sqlite" else create_pool(DB_SESSIONS)
 
+        def make_handler() -> SQLHandler:
+            if DB_BACKEND == "sqlite":
+                return SQLiteHandler(batch_size=DB_BATCH_SIZE, pool=pool, commit_every=DB_COMMIT_EVERY)
+            return SQLHandler(batch_size=DB_BATCH_SIZE, pool=pool, commit_every=DB_COMMIT_EVERY)
+
+        if pool is not None:
+            loader = ParallelLoader(make_handler, sessions=DB_SESSIONS)
+            if not DB_INCREMENTAL:
+                loader.prepare(clear=True)
+            stats = loader.load(PLAYERS, RACES, race_results, incremental=DB_INCREMENTAL)
+        else:
+            handler = make_handler()
+            handler.connect()
+            if DB_INCREMENTAL:
+                stats = handler.load_incremental(PLAYERS, RACES, race_results)
+            else:
+                handler.clear_tables()
+                handler.create_schema()
+                stats = [handler.insert_players(PLAYERS), handler.insert_races(RACES)]
+                stats += handler.insert_results(race_results)
+                handler.commit()
+            handler.close()
+        for s in stats:
+            print(s)
+
+        handler = make_handler()
+        handler.connect()
         handler.cur.execute("SELECT COUNT(*) FROM players")
         print("Betöltött játékosok száma:", handler.cur.fetchone()[0])
         handler.cur.execute("SELECT COUNT(*) FROM races")
         print("Betöltött versenyek száma:", handler.cur.fetchone()[0])
 
         handler.close()
+        if pool is not None:
+            pool.close()
 
     subprocess.run(["python", "-m", "streamlit", "run", "dashboard/app.py"])
 